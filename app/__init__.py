@@ -1,27 +1,125 @@
+import logging
+import sys
+import time
+
+_import_start = time.perf_counter()
+
 from flask import Flask, g
+from sqlalchemy import exc
+from sqlalchemy.orm import Session
+from werkzeug.local import LocalProxy
 from app.config import Config
 from app.routes import register_routes
-from app.database import Base, engine, get_db_connection
+from app.database import Base, engine, SessionLocal, add_missing_columns, add_missing_indexes
+from app.metrics import DB_POOL_TIMEOUTS, DB_POOL_WAIT
 from app.users.entity import User
 from app.predictions.entity import Prediction
 
+_import_time = time.perf_counter() - _import_start
+logger = logging.getLogger(__name__)
+
+# Module nặng chỉ nên được import khi có request dự đoán (xem startup report)
+HEAVY_MODULES = ("tensorflow", "tflite_runtime", "sklearn", "scipy", "numba")
+
+
+def get_request_session() -> Session:
+    """
+    Session của request hiện tại, chỉ được mở khi handler dùng tới g.db
+    (close_request_session trả connection về pool khi teardown)
+    """
+    if "_db_session" not in g:
+        session = SessionLocal()
+        start = time.perf_counter()
+        try:
+            session.connection()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.inc()
+            session.close()
+            raise
+        DB_POOL_WAIT.observe(time.perf_counter() - start)
+        g._db_session = session
+    return g._db_session
+
+
+def close_request_session(exception=None) -> None:
+    session = g.pop("_db_session", None)
+    if session is not None:
+        session.close()
+
+
+def create_tables(migrate: bool = True) -> None:
+    """
+    Tạo các bảng còn thiếu; migrate=True (python manage.py create-db) thêm cả
+    cột nullable và index còn thiếu (hoặc INVALID) trên bảng đã có
+    """
+    from app.auth.entity import OTP
+    Base.metadata.create_all(bind=engine)
+    if migrate:
+        add_missing_columns(engine)
+        add_missing_indexes(engine)
+
+
+def install_model_reload_signal(signal_name: str) -> None:
+    import signal
+    import threading
+
+    # signal.signal chỉ gọi được từ main thread
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    def handle_reload(signum, frame):
+        from app.predictions.libs.heart_disease_model import HeartDiseaseModel, ModelSwapInProgress
+        try:
+            HeartDiseaseModel().reload()
+        except ModelSwapInProgress:
+            pass
+
+    signal.signal(getattr(signal, signal_name), handle_reload)
+
+
 def create_app(config_class=Config):
+    start = time.perf_counter()
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    # g.db mở session (lấy connection từ pool) ở lần dùng đầu tiên, không phải mọi request
     @app.before_request
     def before_request():
-        g.db = get_db_connection()
+        g.db = LocalProxy(get_request_session)
+
+    app.teardown_appcontext(close_request_session)
+
+    # Create tables (fast-boot: bỏ qua). Cột / index trên bảng đã có chỉ được thêm bởi
+    # `python manage.py create-db` khi deploy, không phải ở mỗi worker gunicorn
+    if not config_class.FAST_BOOT:
+        with app.app_context():
+            create_tables(migrate=False)
 
-    # Create tables
-    with app.app_context():
-        Base.metadata.create_all(bind=engine)
-    
     # Register all routes and blueprints
     register_routes(app)
-    
+
+    if config_class.METRICS_ENABLED:
+        from app.metrics import init_metrics
+        init_metrics(app)
+
+    # Signal reload model (vd. MODEL_RELOAD_SIGNAL=SIGHUP, `kill -HUP <worker pid>`)
+    if config_class.MODEL_RELOAD_SIGNAL:
+        install_model_reload_signal(config_class.MODEL_RELOAD_SIGNAL)
+
     @app.route('/health')
     def health_check():
         return {'status': 'ok'}
-    
-    return app
\ No newline at end of file
+
+    app.config['STARTUP_REPORT'] = {
+        "fast_boot": config_class.FAST_BOOT,
+        "import_time": _import_time,
+        "create_app_time": time.perf_counter() - start,
+        "heavy_modules_loaded": [name for name in HEAVY_MODULES if name in sys.modules]
+    }
+    if config_class.STARTUP_REPORT:
+        report = app.config['STARTUP_REPORT']
+        logger.info("Startup: import %.0f ms, create_app %.0f ms, fast_boot=%s, heavy modules: %s",
+                    report['import_time']*1000, report['create_app_time']*1000, report['fast_boot'],
+                    ', '.join(report['heavy_modules_loaded']) or 'none')
+
+    return app
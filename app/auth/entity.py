@@ -1,10 +1,17 @@
-from sqlalchemy import Column, Integer, String, Boolean, BigInteger, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, BigInteger, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 
 class OTP(Base):
     __tablename__ = "otps"
+    __table_args__ = (
+        # get_by_user_and_code (bằng nhau trên 3 cột đầu, khoảng trên expired_time);
+        # tiền tố user_id dùng cho invalidate_user_otps / get_latest_by_user
+        Index("ix_otps_user_id_otp_code_otp_used_expired_time", "user_id", "otp_code", "otp_used", "expired_time"),
+        # cleanup_expired_otps
+        Index("ix_otps_expired_time", "expired_time"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
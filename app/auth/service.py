@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from typing import Optional, Dict, Any, Tuple
 import bcrypt
+from app.metrics import stage_timer
 import jwt
 import time
 import random
@@ -28,12 +29,14 @@ class AuthService:
 
     def _hash_password(self, password: str) -> str:
         """Hash password using bcrypt"""
-        salt = bcrypt.gensalt()
-        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        with stage_timer("password_hash"):
+            salt = bcrypt.gensalt()
+            return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
 
     def _verify_password(self, password: str, hashed: str) -> bool:
         """Verify password against hash"""
-        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+        with stage_timer("password_verify"):
+            return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
     def _generate_otp(self) -> str:
         """Generate 6-digit OTP"""
@@ -300,7 +303,8 @@ class AuthService:
     def verify_jwt_token(self, token: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
         """Verify JWT token and return payload"""
         try:
-            payload = jwt.decode(token, self.jwt_secret, algorithms=[self.jwt_algorithm])
+            with stage_timer("jwt_verify"):
+                payload = jwt.decode(token, self.jwt_secret, algorithms=[self.jwt_algorithm])
             return payload, None
         except jwt.ExpiredSignatureError:
             return None, "Token has expired"
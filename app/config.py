@@ -23,3 +23,58 @@ class Config:
 
     # PostgreSQL database URI
     SQLALCHEMY_DATABASE_URI = os.environ['DATABASE_URL'] #
+
+    # Connection pool (mỗi process gunicorn 1 pool: tối đa DB_POOL_SIZE + DB_MAX_OVERFLOW connection)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+
+    # ECG DSP execution: "inline" (trong request thread) hoặc "process" (process pool)
+    ECG_EXECUTOR = os.environ.get('ECG_EXECUTOR', 'inline').lower()
+    # Mỗi web worker 1 pool: mặc định chia CPU cho số worker gunicorn (WEB_CONCURRENCY), không có thì 1
+    ECG_POOL_WORKERS = int(os.environ.get(
+        'ECG_POOL_WORKERS',
+        max(1, (os.cpu_count() or 1) // int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1)))
+    ))
+    ECG_POOL_MAX_PENDING = int(os.environ.get('ECG_POOL_MAX_PENDING', 2 * ECG_POOL_WORKERS))
+    ECG_TASK_TIMEOUT = float(os.environ.get('ECG_TASK_TIMEOUT', 10))
+
+    # Micro-batching cho HeartDiseaseModel (0 = tắt, mỗi request 1 lần predict)
+    MODEL_BATCH_WINDOW_MS = float(os.environ.get('MODEL_BATCH_WINDOW_MS', 0))
+    MODEL_MAX_BATCH_SIZE = int(os.environ.get('MODEL_MAX_BATCH_SIZE', 32))
+    # Thời gian tối đa 1 request chờ kết quả từ micro-batcher (giây)
+    MODEL_BATCH_TIMEOUT = float(os.environ.get('MODEL_BATCH_TIMEOUT', 30))
+
+    # Inference backend: "keras" (MODEL_PATH + SCALER_PATH), "tflite" hoặc "numpy" (scaler đã gộp vào model)
+    MODEL_BACKEND = os.environ.get('MODEL_BACKEND', 'keras').lower()
+    TFLITE_MODEL_PATH = os.environ.get('TFLITE_MODEL_PATH', './model/heart_cnn_lstm_model_fp16.tflite')
+    TFLITE_NUM_THREADS = int(os.environ.get('TFLITE_NUM_THREADS', 1))
+    NUMPY_MODEL_PATH = os.environ.get('NUMPY_MODEL_PATH', './model/heart_cnn_lstm_model.npz')
+
+    # Memo cache kết quả model theo (feature tuple, model version); MODEL_CACHE_SIZE=0 để tắt
+    MODEL_CACHE_SIZE = int(os.environ.get('MODEL_CACHE_SIZE', 1024))
+    MODEL_CACHE_TTL = float(os.environ.get('MODEL_CACHE_TTL', 3600))
+
+    # Hot-swap model: MODEL_VERSIONS_DIR/<version>/ + file CURRENT; worker kiểm tra CURRENT mỗi N giây (0 = tắt)
+    MODEL_VERSIONS_DIR = os.environ.get('MODEL_VERSIONS_DIR', './model/versions')
+    MODEL_VERSION_CHECK_INTERVAL = float(os.environ.get('MODEL_VERSION_CHECK_INTERVAL', 5))
+    MODEL_RELOAD_SIGNAL = os.environ.get('MODEL_RELOAD_SIGNAL', '').upper()
+
+    # Fast-boot: không tạo bảng khi khởi động (dùng `python manage.py create-db`)
+    FAST_BOOT = os.environ.get('FAST_BOOT', 'false').lower() == 'true'
+    STARTUP_REPORT = os.environ.get('STARTUP_REPORT', 'true').lower() == 'true'
+
+    # Phân trang keyset cho các endpoint danh sách (?limit=&cursor=)
+    PAGE_SIZE_DEFAULT = int(os.environ.get('PAGE_SIZE_DEFAULT', 50))
+    PAGE_SIZE_MAX = int(os.environ.get('PAGE_SIZE_MAX', 200))
+
+    # Async prediction jobs (POST /predictions/heart-disease?async=true): số thread worker và số job chờ tối đa
+    PREDICTION_JOB_WORKERS = int(os.environ.get('PREDICTION_JOB_WORKERS', 2))
+    PREDICTION_JOB_MAX_PENDING = int(os.environ.get('PREDICTION_JOB_MAX_PENDING', 64))
+    # Job còn queued/running sau N giây (process chạy nó đã chết) được đánh dấu failed khi tra cứu
+    PREDICTION_JOB_TIMEOUT = float(os.environ.get('PREDICTION_JOB_TIMEOUT', 300))
+
+    # Endpoint /metrics (Prometheus); nhiều worker gunicorn: đặt thêm PROMETHEUS_MULTIPROC_DIR
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
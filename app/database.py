@@ -1,12 +1,101 @@
-from sqlalchemy import create_engine
+import logging
+import time
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.schema import CreateIndex
 from app.config import Config
 
-engine = create_engine(Config.SQLALCHEMY_DATABASE_URI)
+logger = logging.getLogger(__name__)
+
+def engine_options(uri: str) -> dict:
+    """Cấu hình pool từ Config; SQLite (dev/test) không dùng QueuePool nên bỏ size/overflow"""
+    options = {
+        "pool_pre_ping": Config.DB_POOL_PRE_PING,
+        "pool_recycle": Config.DB_POOL_RECYCLE,
+    }
+    if make_url(uri).get_backend_name() != "sqlite":
+        options.update({
+            "pool_size": Config.DB_POOL_SIZE,
+            "max_overflow": Config.DB_MAX_OVERFLOW,
+            "pool_timeout": Config.DB_POOL_TIMEOUT,
+        })
+    return options
+
+engine = create_engine(Config.SQLALCHEMY_DATABASE_URI, **engine_options(Config.SQLALCHEMY_DATABASE_URI))
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
 Base = declarative_base()
 
 def get_db_connection():
-    return SessionLocal()
\ No newline at end of file
+    return SessionLocal()
+
+def add_missing_columns(bind=engine) -> None:
+    """
+    create_all không sửa bảng đã có: thêm các cột nullable mới
+    (vd. predictions.model_version) bằng ALTER TABLE ADD COLUMN
+
+    Chỉ chạy từ `python manage.py create-db`, không chạy khi worker khởi động
+    (nhiều worker cùng ALTER 1 bảng sẽ tranh nhau)
+    """
+    inspector = inspect(bind)
+    preparer = bind.dialect.identifier_preparer
+    with bind.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=bind.dialect)
+                logger.info("Adding column %s.%s (%s)", table.name, column.name, column_type)
+                connection.execute(text(
+                    f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.quote(column.name)} {column_type}"
+                ))
+
+def invalid_indexes(connection) -> set:
+    """
+    Index PostgreSQL còn INVALID (CREATE INDEX CONCURRENTLY bị ngắt / lỗi giữa chừng):
+    vẫn có tên trong catalog nhưng không được dùng và không được cập nhật đúng
+    """
+    if connection.dialect.name != "postgresql":
+        return set()
+    return set(connection.execute(text(
+        "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE NOT i.indisvalid AND pg_catalog.pg_table_is_visible(c.oid)"
+    )).scalars())
+
+def add_missing_indexes(bind=engine) -> None:
+    """
+    Tạo các index khai báo trong entity mà bảng đã có chưa có. Trên PostgreSQL
+    dùng CREATE INDEX CONCURRENTLY (không khóa ghi bảng lớn, chạy ngoài transaction)
+    và build lại index INVALID do lần tạo trước bị ngắt.
+
+    Chỉ chạy từ `python manage.py create-db` (1 process), không chạy khi worker khởi động:
+    trên bảng lớn việc tạo index lâu hơn boot timeout và các worker sẽ tranh nhau cùng tên index.
+    """
+    inspector = inspect(bind)
+    concurrently = bind.dialect.name == "postgresql"
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        invalid = invalid_indexes(connection)
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in sorted(table.indexes, key=lambda index: index.name):
+                if index.name in invalid:
+                    logger.info("Dropping invalid index %s on %s", index.name, table.name)
+                    connection.execute(text(
+                        f"DROP INDEX CONCURRENTLY IF EXISTS {bind.dialect.identifier_preparer.quote(index.name)}"
+                    ))
+                elif index.name in existing:
+                    continue
+                statement = str(CreateIndex(index).compile(dialect=bind.dialect))
+                if concurrently:
+                    statement = statement.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)
+                logger.info("Creating index %s on %s", index.name, table.name)
+                start = time.perf_counter()
+                connection.execute(text(statement))
+                logger.info("  done in %.1fs", time.perf_counter() - start)
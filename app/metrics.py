@@ -0,0 +1,129 @@
+import os
+import time
+from contextlib import contextmanager
+from flask import Flask, Response, g, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest, multiprocess)
+from sqlalchemy import event
+
+# Multiprocess (gunicorn): đặt PROMETHEUS_MULTIPROC_DIR trước khi start; mỗi worker
+# ghi giá trị metric vào file mmap riêng trong thư mục đó, /metrics gộp tất cả file
+MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+# Từ scaling (~µs) tới bcrypt / DSP trên tín hiệu dài (~s)
+STAGE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Các stage được đo: parse (pydantic), ecg_dsp, scaling, inference, db_write,
+# jwt_verify, password_hash, password_verify
+STAGE_DURATION = Histogram(
+    'heartify_stage_duration_seconds',
+    'Latency of a request processing stage',
+    ['stage'],
+    buckets=STAGE_BUCKETS
+)
+
+REQUEST_COUNT = Counter(
+    'heartify_http_requests_total',
+    'HTTP requests by endpoint and status',
+    ['method', 'endpoint', 'status']
+)
+
+REQUEST_DURATION = Histogram(
+    'heartify_http_request_duration_seconds',
+    'HTTP request latency by endpoint',
+    ['method', 'endpoint'],
+    buckets=STAGE_BUCKETS
+)
+
+
+# Connection pool: thời gian chờ lấy connection cho session của request, số connection
+# đang được dùng (cộng các worker còn sống) để chọn DB_POOL_SIZE theo số worker gunicorn
+DB_POOL_WAIT = Histogram(
+    'heartify_db_pool_wait_seconds',
+    'Time a request waited to check out a database connection',
+    buckets=STAGE_BUCKETS
+)
+
+DB_POOL_CHECKOUTS = Counter(
+    'heartify_db_pool_checkouts_total',
+    'Database connections checked out of the pool'
+)
+
+DB_POOL_TIMEOUTS = Counter(
+    'heartify_db_pool_timeouts_total',
+    'Checkouts that gave up after DB_POOL_TIMEOUT'
+)
+
+DB_POOL_CONNECTIONS = Counter(
+    'heartify_db_pool_connections_total',
+    'New database connections opened by the pool'
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    'heartify_db_pool_checked_out',
+    'Database connections currently checked out',
+    multiprocess_mode='livesum'
+)
+
+
+def instrument_engine(engine) -> None:
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        DB_POOL_CONNECTIONS.inc()
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.inc()
+        DB_POOL_CHECKED_OUT.inc()
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.dec()
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    STAGE_DURATION.labels(stage=stage).observe(seconds)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """with stage_timer("db_write"): ... -> 1 observation vào heartify_stage_duration_seconds"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+def generate_metrics() -> bytes:
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def init_metrics(app: Flask) -> None:
+    """Đếm request theo endpoint/status, đo connection pool và thêm route /metrics"""
+    from app.database import engine
+    instrument_engine(engine)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        # Dùng rule (vd. /predictions/<int:prediction_id>) để số label không tăng theo id
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        REQUEST_COUNT.labels(method=request.method, endpoint=endpoint, status=response.status_code).inc()
+        if 'request_start' in g:
+            REQUEST_DURATION.labels(method=request.method, endpoint=endpoint).observe(
+                time.perf_counter() - g.request_start
+            )
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(generate_metrics(), content_type=CONTENT_TYPE_LATEST)
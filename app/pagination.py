@@ -0,0 +1,67 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Mapping, Optional, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+from app.config import Config
+
+# Vị trí trong danh sách sắp xếp (created_at DESC, id DESC): (created_at, id) của dòng cuối trang trước
+Cursor = Tuple[datetime, int]
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(payload)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def parse_page_args(args: Mapping[str, Any]) -> Tuple[int, Optional[Cursor]]:
+    """
+    ?limit=&cursor= của request -> (limit, cursor)
+
+    Raises:
+        ValueError: limit không phải số nguyên dương hoặc cursor không hợp lệ
+    """
+    try:
+        limit = int(args.get("limit", Config.PAGE_SIZE_DEFAULT))
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be >= 1")
+
+    cursor = args.get("cursor")
+    return min(limit, Config.PAGE_SIZE_MAX), decode_cursor(cursor) if cursor else None
+
+
+def keyset_page(query: Query, created_column, id_column, limit: int,
+                cursor: Optional[Cursor] = None) -> Tuple[List[Any], Optional[str]]:
+    """
+    1 trang theo (created_at DESC, id DESC) bắt đầu sau cursor
+
+    Điều kiện (created_at, id) < cursor đi thẳng vào index (…, created_at) nên
+    thời gian không phụ thuộc vị trí trang (khác OFFSET). Lấy limit + 1 dòng
+    để biết còn trang sau hay không.
+
+    Returns:
+        (items, next_cursor) - next_cursor None ở trang cuối
+    """
+    if cursor is not None:
+        query = query.filter(tuple_(created_column, id_column) < tuple_(*cursor))
+    rows = query.order_by(created_column.desc(), id_column.desc()).limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, created_column.key), getattr(last, id_column.key))
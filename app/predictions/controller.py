@@ -1,7 +1,11 @@
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, Response, request, jsonify, g, url_for
+from app.predictions.export import EXPORT_FORMATS, export_predictions as stream_export
+from app.predictions.jobs import JobQueueFull
 from app.predictions.schema import HeartDiseaseInput, PredictionResponse
 from app.predictions.service import PredictionService
 from app.auth.controller import jwt_required
+from app.metrics import stage_timer
+from app.pagination import parse_page_args
 
 prediction_bp = Blueprint('predictions', __name__)
 
@@ -9,9 +13,14 @@ prediction_bp = Blueprint('predictions', __name__)
 @jwt_required
 def predict_heart_disease():
     try:
-        data = HeartDiseaseInput.parse_obj(request.json)
+        with stage_timer("parse"):
+            data = HeartDiseaseInput.parse_obj(request.json)
         service = PredictionService(g.db)
         
+        # Async mode: trả 202 + job id ngay, client poll GET /predictions/jobs/<job_id>
+        if _wants_async():
+            return _enqueue_prediction(service, data)
+        
         # Use authenticated user's ID from JWT token
         prediction, error = service.predict_heart_disease(data, g.current_user['user_id'])
         
@@ -31,6 +40,7 @@ def predict_heart_disease():
             exang=prediction.exang,
             probability=prediction.probability,
             prediction=prediction.prediction,
+            model_version=prediction.model_version,
             created_at=prediction.created_at
         )
             
@@ -38,13 +48,64 @@ def predict_heart_disease():
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
+def _wants_async() -> bool:
+    return (request.args.get('async', '').lower() in ('1', 'true')
+            or 'respond-async' in request.headers.get('Prefer', ''))
+
+def _job_status(job) -> dict:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": url_for('predictions.get_prediction_job', job_id=job.id)
+    }
+
+def _enqueue_prediction(service, data):
+    try:
+        job, error = service.enqueue_prediction(data, g.current_user['user_id'])
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+    if error:
+        return jsonify(error), 400
+
+    status = _job_status(job)
+    return jsonify(status), 202, {"Location": status["status_url"]}
+
+@prediction_bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required
+def get_prediction_job(job_id):
+    """Status of an async prediction job; the PredictionResponse once it has succeeded"""
+    service = PredictionService(g.db)
+    job = service.get_job(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+
+    if job.user_id != g.current_user['user_id'] and g.current_user.get('role', 'user') != 'admin':
+        return jsonify({"error": "Access denied"}), 403
+
+    if job.status == "failed":
+        return jsonify(dict(_job_status(job), error=job.error)), 200
+
+    if job.status != "succeeded":
+        return jsonify(_job_status(job)), 202, {"Retry-After": "1"}
+
+    prediction = service.get_prediction(job.prediction_id)
+    if not prediction:
+        return jsonify({"error": "Prediction not found"}), 404
+
+    return jsonify(PredictionResponse.from_orm(prediction).dict()), 200
+
 @prediction_bp.route('/', methods=['GET'])
 @jwt_required
 def list_predictions():
-    """Get all predictions for the authenticated user"""
+    """Get the authenticated user's predictions, newest first (?limit=&cursor=)"""
+    try:
+        limit, cursor = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
     service = PredictionService(g.db)
     user_id = g.current_user['user_id']
-    predictions = service.get_user_predictions(user_id)
+    predictions, next_cursor = service.get_user_predictions(user_id, limit, cursor)
     result = []
     for p in predictions:
         response = PredictionResponse(
@@ -59,10 +120,11 @@ def list_predictions():
             exang=p.exang,
             probability=p.probability,
             prediction=p.prediction,
+            model_version=p.model_version,
             created_at=p.created_at
         )
         result.append(response.dict())
-    return jsonify(result), 200
+    return jsonify({"items": result, "next_cursor": next_cursor}), 200
 
 @prediction_bp.route('/<int:prediction_id>', methods=['GET'])
 @jwt_required
@@ -90,6 +152,7 @@ def get_prediction(prediction_id):
         exang=prediction.exang,
         probability=prediction.probability,
         prediction=prediction.prediction,
+        model_version=prediction.model_version,
         created_at=prediction.created_at
     )
     return jsonify(response.dict()), 200
@@ -105,8 +168,13 @@ def get_user_predictions(user_id):
     if current_user_id != user_id and current_user_role != 'admin':
         return jsonify({"error": "Access denied"}), 403
     
+    try:
+        limit, cursor = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
     service = PredictionService(g.db)
-    predictions = service.get_user_predictions(user_id)
+    predictions, next_cursor = service.get_user_predictions(user_id, limit, cursor)
     result = []
     for p in predictions:
         response = PredictionResponse(
@@ -121,10 +189,11 @@ def get_user_predictions(user_id):
             exang=p.exang,
             probability=p.probability,
             prediction=p.prediction,
+            model_version=p.model_version,
             created_at=p.created_at
         )
         result.append(response.dict())
-    return jsonify(result), 200
+    return jsonify({"items": result, "next_cursor": next_cursor}), 200
 
 @prediction_bp.route('/<int:prediction_id>', methods=['DELETE'])
 @jwt_required
@@ -151,14 +220,19 @@ def delete_prediction(prediction_id):
 @prediction_bp.route('/admin/all', methods=['GET'])
 @jwt_required
 def get_all_predictions():
-    """Admin only: Get all predictions from all users"""
+    """Admin only: Get predictions from all users, newest first (?limit=&cursor=)"""
     user_role = g.current_user.get('role', 'user')
     
     if user_role != 'admin':
         return jsonify({"error": "Admin access required"}), 403
     
+    try:
+        limit, cursor = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
     service = PredictionService(g.db)
-    predictions = service.get_all_predictions()
+    predictions, next_cursor = service.get_all_predictions(limit, cursor)
     result = []
     for p in predictions:
         response = PredictionResponse(
@@ -173,7 +247,101 @@ def get_all_predictions():
             exang=p.exang,
             probability=p.probability,
             prediction=p.prediction,
+            model_version=p.model_version,
             created_at=p.created_at
         )
         result.append(response.dict())
-    return jsonify(result), 200
\ No newline at end of file
+    return jsonify({"items": result, "next_cursor": next_cursor}), 200
+
+def _int_arg(name: str, default: int, low: int, high: int) -> int:
+    """
+    Query param số nguyên trong [low, high], default nếu không có
+
+    Raises:
+        ValueError: không phải số nguyên hoặc ngoài khoảng
+    """
+    value = request.args.get(name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+    if not low <= value <= high:
+        raise ValueError(f"{name} must be in {low}-{high}")
+    return value
+
+@prediction_bp.route('/admin/analytics', methods=['GET'])
+@jwt_required
+def get_prediction_analytics():
+    """Admin only: Prediction counts, daily positive rate (?days=), restecg distribution, probability histogram (?bins=)"""
+    if g.current_user.get('role', 'user') != 'admin':
+        return jsonify({"error": "Admin access required"}), 403
+
+    try:
+        days = _int_arg('days', 30, 1, 366)
+        bins = _int_arg('bins', 10, 1, 100)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    service = PredictionService(g.db)
+    return jsonify(service.get_analytics(days, bins)), 200
+
+@prediction_bp.route('/admin/export', methods=['GET'])
+@jwt_required
+def export_predictions():
+    """Admin only: Stream all predictions (or one user's, ?user_id=) as NDJSON or CSV (?format=)"""
+    if g.current_user.get('role', 'user') != 'admin':
+        return jsonify({"error": "Admin access required"}), 403
+
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"format must be one of {', '.join(EXPORT_FORMATS)}"}), 400
+    user_id = request.args.get('user_id')
+    if user_id is not None:
+        try:
+            user_id = int(user_id)
+        except ValueError:
+            return jsonify({"error": "user_id must be an integer"}), 400
+
+    return Response(
+        stream_export(export_format, user_id),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f"attachment; filename=predictions.{export_format}"}
+    )
+
+@prediction_bp.route('/admin/model', methods=['GET'])
+@jwt_required
+def get_model_status():
+    """Admin only: Current model version, swap state and cache stats"""
+    if g.current_user.get('role', 'user') != 'admin':
+        return jsonify({"error": "Admin access required"}), 403
+
+    return jsonify(PredictionService.get_model_status()), 200
+
+@prediction_bp.route('/admin/model/reload', methods=['POST'])
+@jwt_required
+def reload_model():
+    """Admin only: Load a model version in the background and swap it in when warmed up"""
+    if g.current_user.get('role', 'user') != 'admin':
+        return jsonify({"error": "Admin access required"}), 403
+
+    from app.predictions.libs.heart_disease_model import ModelSwapInProgress
+
+    body = request.get_json(silent=True)
+    if body is None:
+        body = {}
+    if not isinstance(body, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    version = body.get('version')
+    if version is not None and (not isinstance(version, str) or not version.strip()):
+        return jsonify({"error": "version must be a non-empty string"}), 400
+
+    try:
+        status, error = PredictionService.reload_model(version)
+    except ModelSwapInProgress as e:
+        return jsonify({"error": str(e)}), 409
+    if error:
+        return jsonify(error), 400
+
+    return jsonify(status), 202
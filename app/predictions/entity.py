@@ -1,10 +1,16 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 
 class Prediction(Base):
     __tablename__ = "predictions"
+    __table_args__ = (
+        # Lịch sử của 1 user theo thời gian (get_by_user_id, thống kê, phân trang)
+        Index("ix_predictions_user_id_created_at", "user_id", "created_at"),
+        # Danh sách / thống kê toàn hệ thống theo thời gian (admin)
+        Index("ix_predictions_created_at", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -21,7 +27,25 @@ class Prediction(Base):
     # Prediction results
     probability = Column(Float, nullable=False)
     prediction = Column(String, nullable=False)
+    model_version = Column(String, nullable=True)
     created_at = Column(DateTime, default=func.now(), nullable=False)
     
     # Relationship to User
-    user = relationship("User", back_populates="predictions")
\ No newline at end of file
+    user = relationship("User", back_populates="predictions")
+
+
+class PredictionJob(Base):
+    __tablename__ = "prediction_jobs"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    # queued -> running -> succeeded | failed
+    status = Column(String, nullable=False, default="queued")
+    prediction_id = Column(Integer, nullable=True)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+
+    # Relationship to User
+    user = relationship("User", back_populates="prediction_jobs")
\ No newline at end of file
@@ -0,0 +1,76 @@
+import csv
+import io
+import json
+from typing import Iterator, Optional
+
+from app.database import SessionLocal
+from app.predictions.entity import Prediction
+from app.predictions.repository import PredictionRepository
+from app.predictions.schema import PredictionResponse
+
+# Cột xuất ra, cùng thứ tự / tên với PredictionResponse
+EXPORT_FIELDS = list(PredictionResponse.__fields__)
+CREATED_AT = EXPORT_FIELDS.index("created_at")
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+
+def _rows(user_id: Optional[int], chunk_size: int) -> Iterator[tuple]:
+    """
+    Đọc bằng session riêng (không phải g.db): generator chạy sau khi view đã
+    return, connection chỉ được trả về pool khi stream kết thúc hoặc client ngắt
+    """
+    db = SessionLocal()
+    try:
+        columns = [getattr(Prediction, field) for field in EXPORT_FIELDS]
+        yield from PredictionRepository(db).stream_columns(columns, user_id, chunk_size)
+    finally:
+        db.close()
+
+
+def export_ndjson(user_id: Optional[int] = None, chunk_size: int = 2000) -> Iterator[str]:
+    """1 dòng JSON mỗi prediction; dòng đầu gửi ngay, sau đó gom theo chunk để giảm số lần ghi socket"""
+    lines = []
+    flush_at = 1
+    for row in _rows(user_id, chunk_size):
+        record = dict(zip(EXPORT_FIELDS, row))
+        record["created_at"] = record["created_at"].isoformat()
+        lines.append(json.dumps(record, separators=(",", ":")))
+        if len(lines) >= flush_at:
+            yield "\n".join(lines) + "\n"
+            lines = []
+            flush_at = chunk_size
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def export_csv(user_id: Optional[int] = None, chunk_size: int = 2000) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    # Header được gửi ngay, trước khi query trả dòng đầu tiên
+    writer.writerow(EXPORT_FIELDS)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    count = 0
+    for row in _rows(user_id, chunk_size):
+        row = list(row)
+        row[CREATED_AT] = row[CREATED_AT].isoformat()
+        writer.writerow(row)
+        count += 1
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_predictions(export_format: str, user_id: Optional[int] = None, chunk_size: int = 2000) -> Iterator[str]:
+    if export_format == "csv":
+        return export_csv(user_id, chunk_size)
+    return export_ndjson(user_id, chunk_size)
@@ -0,0 +1,115 @@
+import atexit
+import os
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+from app.config import Config
+from app.database import SessionLocal
+from app.predictions.entity import PredictionJob
+from app.predictions.repository import PredictionJobRepository
+from app.predictions.schema import HeartDiseaseInput
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+def run_prediction_job(job_id: str, input_data: HeartDiseaseInput, user_id: int) -> None:
+    """Chạy trong thread worker: session riêng, kết quả ghi vào bảng prediction_jobs"""
+    from app.predictions.service import PredictionService
+
+    db = SessionLocal()
+    jobs = PredictionJobRepository(db)
+    try:
+        if not jobs.update_status(job_id, "running"):
+            # Đã bị đánh dấu failed (quá hạn) trước khi tới lượt chạy
+            return
+        prediction, error = PredictionService(db).predict_heart_disease(input_data, user_id)
+        if error:
+            jobs.update_status(job_id, "failed", error=error["error"])
+        else:
+            jobs.update_status(job_id, "succeeded", prediction_id=prediction.id)
+    except Exception as e:
+        traceback.print_exc()
+        db.rollback()
+        jobs.update_status(job_id, "failed", error=str(e))
+    finally:
+        db.close()
+
+
+class PredictionJobQueue:
+    """
+    Thread pool cục bộ chạy predict_heart_disease cho các request async
+
+    Trạng thái job nằm trong DB (không phải bộ nhớ process) nên GET trạng
+    thái trả lời được từ bất kỳ worker gunicorn nào. Dùng thread thay vì
+    process: DSP đã có thể chạy trên ECGExecutor pool và các job đồng thời
+    được MicroBatcher gom batch khi vào model. Số job chờ/chạy bị giới hạn
+    bởi PREDICTION_JOB_MAX_PENDING; khi đầy submit() báo JobQueueFull.
+    Job đang chờ bị mất nếu process dừng; quá PREDICTION_JOB_TIMEOUT giây thì
+    lần tra cứu trạng thái đánh dấu job đó failed (PredictionService.get_job).
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, workers: int = 2, max_pending: int = 64):
+        self.workers = max(1, workers)
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._pool = None
+        self._pid = None
+        self._pool_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self.submitted = 0
+        self.rejected = 0
+
+    @classmethod
+    def shared(cls) -> "PredictionJobQueue":
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls(workers=Config.PREDICTION_JOB_WORKERS,
+                                        max_pending=Config.PREDICTION_JOB_MAX_PENDING)
+        return cls._instance
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        # Thread không được copy sang process con khi fork: tạo pool mới theo pid
+        with self._pool_lock:
+            if self._pool is None or self._pid != os.getpid():
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="prediction-job")
+                self._pid = os.getpid()
+                atexit.register(self._pool.shutdown, wait=False, cancel_futures=True)
+            return self._pool
+
+    def submit(self, db, input_data: HeartDiseaseInput, user_id: int) -> PredictionJob:
+        """
+        Tạo job (status queued) bằng session của request rồi đưa vào pool
+
+        Raises:
+            JobQueueFull: đã có PREDICTION_JOB_MAX_PENDING job chờ/chạy
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self.rejected += 1
+            raise JobQueueFull("Prediction queue is full, retry later")
+
+        try:
+            job = PredictionJobRepository(db).create(
+                PredictionJob(id=uuid.uuid4().hex, user_id=user_id, status="queued")
+            )
+            future = self._get_pool().submit(run_prediction_job, job.id, input_data, user_id)
+        except Exception:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self._slots.release())
+        with self._stats_lock:
+            self.submitted += 1
+        return job
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            return {"workers": self.workers, "submitted": self.submitted, "rejected": self.rejected}
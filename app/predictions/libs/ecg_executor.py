@@ -0,0 +1,172 @@
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from app.config import Config
+from app.predictions.libs.ecg_classifier import ECGClassifier
+
+
+def _classify_in_worker(ecg_signal: np.ndarray, sampling_rate: int, adc_gain: float) -> Tuple[int, Dict]:
+    """Chạy trong process worker: ECGClassifier dùng chung theo từng process"""
+    return ECGClassifier.shared(sampling_rate=sampling_rate, adc_gain=adc_gain).classify_ecg(ecg_signal)
+
+
+class ECGExecutor:
+    """
+    Chạy classify_ecg inline hoặc trên process pool (Config.ECG_EXECUTOR)
+
+    Ở chế độ "process", phần DSP numpy/scipy chạy trên các process riêng nên
+    không tranh GIL với các request khác trong cùng web worker. Số task đang
+    chờ/chạy bị giới hạn bởi ECG_POOL_MAX_PENDING; khi pool đầy, bị tắt
+    hoặc bị hỏng thì chạy inline. Task quá ECG_TASK_TIMEOUT giây báo lỗi và
+    pool bị thay: pool cũ shutdown(cancel_futures=True) không chờ, task đang
+    chạy (không cancel được) chạy nốt rồi process cũ tự thoát, pool mới được
+    tạo ở lần gọi sau.
+
+    Worker được tạo bằng forkserver (spawn nếu không có), không fork trực tiếp
+    từ web worker: lúc đó đã có thread micro-batcher / job / hot-swap (và có thể
+    TensorFlow), fork sau khi có thread có thể làm process con deadlock. Server
+    của forkserver chỉ preload các module lá (numpy, scipy, ecg_classifier) nên
+    mỗi worker không phải import lại scipy/numba.
+    """
+    EXECUTION_MODES = ("inline", "process")
+    PRELOAD_MODULES = ["numpy", "scipy.signal", "app.predictions.libs.ecg_classifier"]
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, mode: str = "inline", workers: int = 1, max_pending: int = 2,
+                 timeout: Optional[float] = 10, sampling_rate: int = 250, adc_gain: float = 1.0):
+        if mode not in self.EXECUTION_MODES:
+            raise ValueError(f"Unknown ECG execution mode '{mode}', expected one of {self.EXECUTION_MODES}")
+
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.sampling_rate = sampling_rate
+        self.adc_gain = adc_gain
+
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        if mode == "process":
+            atexit.register(self._shutdown_at_exit)
+
+        self._stats_lock = threading.Lock()
+        self.submitted = 0
+        self.inline = 0
+        self.saturated = 0
+        self.timeouts = 0
+        self.broken = 0
+
+    @classmethod
+    def shared(cls) -> "ECGExecutor":
+        """Executor dùng chung theo cấu hình trong Config"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls(
+                        mode=Config.ECG_EXECUTOR,
+                        workers=Config.ECG_POOL_WORKERS,
+                        max_pending=Config.ECG_POOL_MAX_PENDING,
+                        timeout=Config.ECG_TASK_TIMEOUT
+                    )
+        return cls._instance
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                if "forkserver" in multiprocessing.get_all_start_methods():
+                    context = multiprocessing.get_context("forkserver")
+                    context.set_forkserver_preload(self.PRELOAD_MODULES)
+                else:
+                    context = multiprocessing.get_context("spawn")
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        """
+        Bỏ pool hỏng hoặc bị treo; task chờ trong pool bị cancel, lần gọi sau
+        tạo pool mới
+        """
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _run_inline(self, ecg_signal: np.ndarray) -> Tuple[int, Dict]:
+        self._count("inline")
+        classifier = ECGClassifier.shared(sampling_rate=self.sampling_rate, adc_gain=self.adc_gain)
+        return classifier.classify_ecg(ecg_signal)
+
+    def classify_ecg(self, ecg_signal: np.ndarray) -> Tuple[int, Dict]:
+        """
+        Giống ECGClassifier.classify_ecg, chạy trên pool nếu còn slot
+
+        Raises:
+            TimeoutError: task trên pool chạy quá timeout
+        """
+        if self.mode == "inline":
+            return self._run_inline(ecg_signal)
+
+        if not self._slots.acquire(blocking=False):
+            self._count("saturated")
+            return self._run_inline(ecg_signal)
+
+        pool = self._get_pool()
+        try:
+            future = pool.submit(_classify_in_worker, ecg_signal, self.sampling_rate, self.adc_gain)
+        except (BrokenProcessPool, RuntimeError):
+            self._slots.release()
+            self._count("broken")
+            self._discard_pool(pool)
+            return self._run_inline(ecg_signal)
+
+        # Slot được trả khi task thực sự kết thúc (kể cả sau khi timeout)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._count("submitted")
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            self._count("timeouts")
+            self._discard_pool(pool)
+            raise TimeoutError(f"ECG classification exceeded {self.timeout}s")
+        except BrokenProcessPool:
+            self._count("broken")
+            self._discard_pool(pool)
+            return self._run_inline(ecg_signal)
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            return {
+                "mode": self.mode,
+                "workers": self.workers,
+                "submitted": self.submitted,
+                "inline": self.inline,
+                "saturated": self.saturated,
+                "timeouts": self.timeouts,
+                "broken": self.broken
+            }
+
+    def shutdown(self) -> None:
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _shutdown_at_exit(self) -> None:
+        # Đăng ký 1 lần cho executor; pool hiện tại (nếu có) được dừng không chờ
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
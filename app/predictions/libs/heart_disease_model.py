@@ -1,59 +1,230 @@
+import gc
+import threading
+import time
+from contextlib import contextmanager
 import numpy as np
-from typing import List, Tuple, Union
-import tensorflow as tf
-import joblib
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 from app.config import Config
+from app.predictions.libs.micro_batcher import MicroBatcher
+from app.predictions.libs.model_backends import create_backend
+from app.predictions.libs.model_registry import current_version, set_current_version, version_dir
+from app.predictions.libs.prediction_cache import PredictionCache
+
+# Input dùng để warm-up model mới trước khi swap
+WARMUP_FEATURES = [54, 1, 2, 130, 1, 150, 0]
+
+
+class ModelSwapInProgress(Exception):
+    pass
+
 
 class HeartDiseaseModel:
     _instance = None
-    
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(HeartDiseaseModel, cls).__new__(cls)
-            cls._instance._model = None
-            cls._instance._scaler = None
+            cls._instance._backend = None
+            cls._instance._batcher = None
+            cls._instance._cache = PredictionCache(maxsize=Config.MODEL_CACHE_SIZE, ttl=Config.MODEL_CACHE_TTL)
+            cls._instance._load_lock = threading.Lock()
+            cls._instance._swap_lock = threading.Lock()
+            cls._instance._swap_status = {"state": "idle"}
+            cls._instance._in_flight = {}
+            cls._instance._in_flight_lock = threading.Lock()
+            cls._instance._in_flight_released = threading.Condition(cls._instance._in_flight_lock)
+            cls._instance._loaded_label = None
+            cls._instance._next_version_check = 0.0
+            if Config.MODEL_BATCH_WINDOW_MS > 0:
+                cls._instance._batcher = MicroBatcher(
+                    cls._instance.predict_batch_versioned,
+                    window=Config.MODEL_BATCH_WINDOW_MS / 1000,
+                    max_batch_size=Config.MODEL_MAX_BATCH_SIZE,
+                    timeout=Config.MODEL_BATCH_TIMEOUT
+                )
         return cls._instance
-    
+
+    @staticmethod
+    def _build_backend(label: Optional[str]):
+        # Backend theo Config.MODEL_BACKEND ("keras", "tflite" hoặc "numpy"),
+        # artifact trong MODEL_VERSIONS_DIR/<label>/ nếu có version được chọn
+        backend = create_backend(Config.MODEL_BACKEND, version_dir(label) if label else None, label)
+        backend.load()
+        return backend
+
+    @staticmethod
+    def artifact_version() -> str:
+        """Model version mà load() sẽ dùng (theo CURRENT), chỉ hash file artifact chứ không load model"""
+        label = current_version()
+        return create_backend(Config.MODEL_BACKEND, version_dir(label) if label else None, label).compute_version()
+
     def load(self) -> None:
-        if self._model is None:
-            try:
-                self._model = tf.keras.models.load_model(Config.MODEL_PATH)
-            except Exception as e:
-                raise RuntimeError(f"Failed to load model: {str(e)}")
-                
-        if self._scaler is None:
-            try:
-                self._scaler = joblib.load(Config.SCALER_PATH)
-            except Exception as e:
-                raise RuntimeError(f"Failed to load scaler: {str(e)}")
-    
-    def preprocess(self, features: List[Union[int, float]]) -> np.ndarray:
-        if self._scaler is None:
+        if self._backend is None:
+            with self._load_lock:
+                if self._backend is None:
+                    label = current_version()
+                    self._backend = self._build_backend(label)
+                    self._loaded_label = label
+
+    @contextmanager
+    def _lease(self):
+        """Backend hiện tại + đếm request đang dùng nó (để retire sau khi swap)"""
+        if self._backend is None:
             self.load()
-            
-        # Convert to numpy array and reshape
-        X = np.array([features])
-        
-        # Apply scaling
-        X_scaled = self._scaler.transform(X)
-        
-        # Reshape for CNN-LSTM model (samples, timesteps, features)
-        X_reshaped = X_scaled.reshape((1, X_scaled.shape[1], 1))
-        
-        return X_reshaped
-    
-    def predict(self, features: List[Union[int, float]]) -> Tuple[float, str]:
-        if self._model is None:
+        # Đọc backend và tăng bộ đếm trong cùng 1 lock với phép swap: _retire không
+        # thể thấy backend cũ "rảnh" trong khi request vừa lấy nó chưa kịp đăng ký
+        with self._in_flight_lock:
+            backend = self._backend
+            self._in_flight[id(backend)] = self._in_flight.get(id(backend), 0) + 1
+        try:
+            yield backend
+        finally:
+            with self._in_flight_lock:
+                self._in_flight[id(backend)] -= 1
+                if self._in_flight[id(backend)] == 0:
+                    del self._in_flight[id(backend)]
+                    self._in_flight_released.notify_all()
+
+    # ===== Hot-swap =====
+
+    def reload(self, version: Optional[str] = None, wait: bool = False, persist: bool = False) -> None:
+        """
+        Load model (version chỉ định hoặc CURRENT) ở background, warm-up rồi swap
+
+        persist=True: ghi version vào CURRENT sau khi swap thành công ở worker này,
+        để các worker khác (và worker khởi động lại) chỉ chuyển sang artifact đã load được
+
+        Raises:
+            ModelSwapInProgress: đang có 1 lần swap khác
+        """
+        if not self._swap_lock.acquire(blocking=False):
+            raise ModelSwapInProgress("Model swap already in progress")
+
+        label = version if version is not None else current_version()
+        self._swap_status = {"state": "loading", "version": label, "started_at": time.time()}
+        thread = threading.Thread(target=self._swap, args=(label, persist and label is not None),
+                                  name="model-hot-swap", daemon=True)
+        thread.start()
+        if wait:
+            thread.join()
+
+    def _swap(self, label: Optional[str], persist: bool = False) -> None:
+        try:
+            backend = self._build_backend(label)
+
+            # Warm-up: inference đầu tiên (khởi tạo graph/interpreter) không rơi vào request thật
+            probability = backend.predict(np.array([WARMUP_FEATURES], dtype=np.float64))
+            if not np.all(np.isfinite(probability)) or not np.all((probability >= 0) & (probability <= 1)):
+                raise RuntimeError(f"Warm-up produced invalid output {probability!r}")
+
+            # Swap trong lock của _lease(): request đang chạy vẫn giữ backend cũ
+            with self._in_flight_lock:
+                old_backend, self._backend = self._backend, backend
+                self._loaded_label = label
+        except Exception as e:
+            self._swap_status = dict(self._swap_status, state="failed", error=str(e), finished_at=time.time())
+            self._swap_lock.release()
+            return
+
+        # State vẫn là "loading" tới đây nên _follow_current_version không swap ngược lại
+        status = dict(self._swap_status, state="ready", model_version=backend.version)
+        if persist:
+            try:
+                set_current_version(label)
+            except (ValueError, OSError) as e:
+                status["current_error"] = str(e)
+        self._swap_status = dict(status, finished_at=time.time())
+        self._swap_lock.release()
+
+        if old_backend is not None:
+            self._retire(old_backend)
+
+    def _retire(self, backend) -> None:
+        """Giải phóng backend cũ khi request cuối cùng đang dùng nó trả lease (không có timeout)"""
+        with self._in_flight_released:
+            self._in_flight_released.wait_for(lambda: id(backend) not in self._in_flight)
+        backend.close()
+        gc.collect()
+
+    def _follow_current_version(self) -> None:
+        """Worker khác đổi CURRENT (qua admin endpoint) -> worker này cũng swap"""
+        if Config.MODEL_VERSION_CHECK_INTERVAL <= 0 or time.monotonic() < self._next_version_check:
+            return
+        self._next_version_check = time.monotonic() + Config.MODEL_VERSION_CHECK_INTERVAL
+        label = current_version()
+        if self._backend is None or label == self._loaded_label or self._swap_status.get("state") == "loading":
+            return
+        # Không thử lại mãi 1 version đã swap lỗi
+        if self._swap_status.get("state") == "failed" and self._swap_status.get("version") == label:
+            return
+        try:
+            self.reload(label)
+        except ModelSwapInProgress:
+            pass
+
+    @property
+    def model_version(self) -> str:
+        if self._backend is None:
             self.load()
-        
-        # Preprocess the features
-        X_processed = self.preprocess(features)
-        
+        return self._backend.version
+
+    def status(self) -> Dict:
+        return {
+            "backend": Config.MODEL_BACKEND,
+            "model_version": self._backend.version if self._backend is not None else None,
+            "version_label": self._loaded_label,
+            "swap": dict(self._swap_status),
+            "cache": self._cache.stats(),
+            "batcher": self._batcher.stats() if self._batcher is not None else None
+        }
+
+    def cache_stats(self) -> dict:
+        return self._cache.stats()
+
+    # ===== Inference =====
+
+    def predict_batch_versioned(self, features_batch: Sequence[List[Union[int, float]]]) -> List[Tuple[float, str, str]]:
+        """
+        Dự đoán cho nhiều feature vector bằng 1 lần forward pass, kèm model version đã dùng
+        """
+        # Convert to numpy array (samples, features); scaling/reshape do backend xử lý
+        X = np.atleast_2d(np.array(features_batch, dtype=np.float64))
+
         # Make prediction
-        prediction = self._model.predict(X_processed)
-        probability = float(prediction[0][0])
-        
+        with self._lease() as backend:
+            probabilities = backend.predict(X)
+            version = backend.version
+
         # Convert to human-readable prediction
-        prediction_label = "POSITIVE" if probability > 0.5 else "NEGATIVE"
-        
-        return probability, prediction_label
\ No newline at end of file
+        results = []
+        for probability in probabilities.tolist():
+            prediction_label = "POSITIVE" if probability > 0.5 else "NEGATIVE"
+            results.append((probability, prediction_label, version))
+
+        return results
+
+    def predict_batch(self, features_batch: Sequence[List[Union[int, float]]]) -> List[Tuple[float, str]]:
+        return [(probability, label) for probability, label, _ in self.predict_batch_versioned(features_batch)]
+
+    def predict_versioned(self, features: List[Union[int, float]]) -> Tuple[float, str, str]:
+        self._follow_current_version()
+
+        # Cache hit bỏ qua cả scaler lẫn model; key gồm model version nên đổi model không trả kết quả cũ
+        features_key = tuple(float(value) for value in features)
+        version = self.model_version
+        cached = self._cache.get((features_key, version))
+        if cached is not None:
+            return (*cached, version)
+
+        # Request đồng thời được gom batch nếu bật micro-batching
+        if self._batcher is not None:
+            probability, label, version = self._batcher(features)
+        else:
+            probability, label, version = self.predict_batch_versioned([features])[0]
+
+        self._cache.put((features_key, version), (probability, label))
+        return probability, label, version
+
+    def predict(self, features: List[Union[int, float]]) -> Tuple[float, str]:
+        probability, label, _ = self.predict_versioned(features)
+        return probability, label
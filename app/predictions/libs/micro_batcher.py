@@ -0,0 +1,135 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+
+class MicroBatcher:
+    """
+    Gom các request đồng thời thành 1 batch cho 1 lần forward pass
+
+    Request đầu tiên mở 1 cửa sổ `window` giây; batch được chạy khi đủ
+    `max_batch_size` phần tử hoặc hết cửa sổ. `batch_fn` nhận list input và
+    trả về list kết quả cùng thứ tự; mỗi caller nhận đúng kết quả của mình
+    (hoặc exception của batch). Thread worker được tạo lại sau khi fork
+    (gunicorn preload) vì thread không được copy sang process con.
+
+    Nếu thread worker thoát (vd. BaseException từ batch_fn), mọi request đang
+    chờ nhận lỗi thay vì treo; caller chờ tối đa `timeout` giây.
+    """
+
+    def __init__(self, batch_fn: Callable[[Sequence[Any]], List[Any]], window: float = 0.005, max_batch_size: int = 32,
+                 timeout: float = 30.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+
+        self.batch_fn = batch_fn
+        self.window = max(0.0, window)
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._pid = None
+
+        self.batches = 0
+        self.items = 0
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or self._pid != os.getpid() or not self._worker.is_alive():
+                if self._pid != os.getpid():
+                    self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._worker = threading.Thread(target=self._run, name="model-micro-batcher", daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> List[Tuple[Any, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        futures: List[Future] = []
+        try:
+            while True:
+                futures = []
+                batch = self._collect()
+                # Bỏ các request đã bị cancel trong lúc chờ
+                batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+                if not batch:
+                    continue
+
+                inputs = [item for item, _ in batch]
+                futures = [future for _, future in batch]
+                try:
+                    results = self.batch_fn(inputs)
+                    if len(results) != len(inputs):
+                        raise RuntimeError(f"Batch returned {len(results)} results for {len(inputs)} inputs")
+                except Exception as e:
+                    for future in futures:
+                        future.set_exception(e)
+                    continue
+
+                with self._lock:
+                    self.batches += 1
+                    self.items += len(inputs)
+                for future, result in zip(futures, results):
+                    future.set_result(result)
+        finally:
+            self._fail_pending(futures, RuntimeError("Micro-batcher worker stopped"))
+
+    def _fail_pending(self, futures: List[Future], error: Exception) -> None:
+        """Batch đang chạy + các request còn trong queue nhận lỗi khi worker thoát"""
+        while True:
+            try:
+                futures.append(self._queue.get_nowait()[1])
+            except queue.Empty:
+                break
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+    def submit(self, item: Any) -> Future:
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def __call__(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Gửi 1 input và chờ kết quả của riêng nó (tối đa timeout, mặc định self.timeout giây)
+
+        Raises:
+            TimeoutError: chưa có kết quả sau timeout giây
+        """
+        timeout = self.timeout if timeout is None else timeout
+        future = self.submit(item)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # Còn trong queue thì worker sẽ bỏ qua request này
+            future.cancel()
+            raise TimeoutError(f"Micro-batch result not ready after {timeout}s")
+
+    def stats(self) -> dict:
+        with self._lock:
+            batches, items = self.batches, self.items
+        return {
+            "batches": batches,
+            "items": items,
+            "avg_batch_size": items / batches if batches else 0.0,
+            "window_ms": self.window * 1000,
+            "max_batch_size": self.max_batch_size
+        }
@@ -0,0 +1,192 @@
+import hashlib
+import os
+import threading
+from typing import Optional
+import numpy as np
+import joblib
+
+from app.config import Config
+from app.metrics import stage_timer
+from app.predictions.libs.numpy_model import NumpyCNNLSTM
+
+
+def artifact_version(name: str, *paths: str, label: Optional[str] = None) -> str:
+    """Version của model: [label/]tên backend + hash nội dung các file artifact"""
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    version = f"{name}:{digest.hexdigest()[:12]}"
+    return f"{label}/{version}" if label else version
+
+
+class KerasBackend:
+    """
+    Model .keras + scaler joblib qua tf.keras (TensorFlow chỉ được import khi load)
+    """
+    name = "keras"
+
+    def __init__(self, model_path: str, scaler_path: str, label: Optional[str] = None):
+        self.model_path = model_path
+        self.scaler_path = scaler_path
+        self.label = label
+        self._model = None
+        self._scaler = None
+        self.version = None
+
+    def load(self) -> None:
+        if self._model is None:
+            try:
+                import tensorflow as tf
+                self._model = tf.keras.models.load_model(self.model_path)
+            except Exception as e:
+                raise RuntimeError(f"Failed to load model: {str(e)}")
+
+        if self._scaler is None:
+            try:
+                self._scaler = joblib.load(self.scaler_path)
+            except Exception as e:
+                raise RuntimeError(f"Failed to load scaler: {str(e)}")
+
+        self.version = self.compute_version()
+
+    def compute_version(self) -> str:
+        """Version từ nội dung artifact, không cần load model"""
+        return artifact_version(self.name, self.model_path, self.scaler_path, label=self.label)
+
+    def close(self) -> None:
+        self._model = None
+        self._scaler = None
+
+    def preprocess(self, X: np.ndarray) -> np.ndarray:
+        # Apply scaling
+        X_scaled = self._scaler.transform(X)
+
+        # Reshape for CNN-LSTM model (samples, timesteps, features)
+        return X_scaled.reshape((X_scaled.shape[0], X_scaled.shape[1], 1))
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """X: feature chưa chuẩn hóa (n, 7) -> xác suất (n,)"""
+        with stage_timer("scaling"):
+            X_processed = self.preprocess(X)
+        with stage_timer("inference"):
+            return self._model.predict(X_processed, batch_size=len(X_processed), verbose=0)[:, 0]
+
+
+class TFLiteBackend:
+    """
+    Model TFLite (float16/int8) export từ model/train.py, đã gộp scaler vào graph
+    nên nhận trực tiếp feature chưa chuẩn hóa. Dùng tflite_runtime nếu có,
+    nếu không thì tf.lite.Interpreter.
+    """
+    name = "tflite"
+
+    def __init__(self, model_path: str, num_threads: int = 1, label: Optional[str] = None):
+        self.model_path = model_path
+        self.num_threads = num_threads
+        self.label = label
+        self._interpreter = None
+        self._lock = threading.Lock()
+        self.version = None
+
+    def load(self) -> None:
+        if self._interpreter is not None:
+            return
+        try:
+            try:
+                from tflite_runtime.interpreter import Interpreter
+            except ImportError:
+                import tensorflow as tf
+                Interpreter = tf.lite.Interpreter
+            interpreter = Interpreter(model_path=self.model_path, num_threads=self.num_threads)
+            interpreter.allocate_tensors()
+        except Exception as e:
+            raise RuntimeError(f"Failed to load TFLite model: {str(e)}")
+
+        self._input = interpreter.get_input_details()[0]
+        self._output = interpreter.get_output_details()[0]
+        self._batch_size = int(self._input["shape"][0])
+        self._interpreter = interpreter
+        self.version = self.compute_version()
+
+    def compute_version(self) -> str:
+        return artifact_version(self.name, self.model_path, label=self.label)
+
+    def close(self) -> None:
+        with self._lock:
+            self._interpreter = None
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """X: feature chưa chuẩn hóa (n, 7) -> xác suất (n,)"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+
+        # Interpreter không thread-safe; chỉ resize khi batch size đổi
+        with self._lock, stage_timer("inference"):
+            interpreter = self._interpreter
+            if X.shape[0] != self._batch_size:
+                interpreter.resize_tensor_input(self._input["index"], X.shape)
+                interpreter.allocate_tensors()
+                self._batch_size = X.shape[0]
+            interpreter.set_tensor(self._input["index"], X)
+            interpreter.invoke()
+            output = interpreter.get_tensor(self._output["index"])
+
+        return output.reshape(len(X), -1)[:, 0].astype(np.float64)
+
+
+class NumpyBackend:
+    """
+    Forward pass NumPy (NumpyCNNLSTM) từ weights npz export bằng
+    model/export_numpy.py: không import TensorFlow, scaler đã gộp vào
+    """
+    name = "numpy"
+
+    def __init__(self, model_path: str, label: Optional[str] = None):
+        self.model_path = model_path
+        self.label = label
+        self._engine = None
+        self.version = None
+
+    def load(self) -> None:
+        if self._engine is None:
+            try:
+                self._engine = NumpyCNNLSTM.load(self.model_path)
+            except Exception as e:
+                raise RuntimeError(f"Failed to load NumPy model: {str(e)}")
+            self.version = self.compute_version()
+
+    def compute_version(self) -> str:
+        return artifact_version(self.name, self.model_path, label=self.label)
+
+    def close(self) -> None:
+        self._engine = None
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """X: feature chưa chuẩn hóa (n, 7) -> xác suất (n,)"""
+        with stage_timer("inference"):
+            return self._engine.predict(X)
+
+
+def _artifact_path(path: str, artifact_dir: Optional[str]) -> str:
+    # Version trong MODEL_VERSIONS_DIR dùng cùng tên file với đường dẫn cấu hình
+    return os.path.join(artifact_dir, os.path.basename(path)) if artifact_dir else path
+
+
+MODEL_BACKENDS = {
+    KerasBackend.name: lambda d, label: KerasBackend(
+        _artifact_path(Config.MODEL_PATH, d), _artifact_path(Config.SCALER_PATH, d), label=label),
+    TFLiteBackend.name: lambda d, label: TFLiteBackend(
+        _artifact_path(Config.TFLITE_MODEL_PATH, d), Config.TFLITE_NUM_THREADS, label=label),
+    NumpyBackend.name: lambda d, label: NumpyBackend(_artifact_path(Config.NUMPY_MODEL_PATH, d), label=label),
+}
+
+
+def create_backend(name: str, artifact_dir: Optional[str] = None, label: Optional[str] = None):
+    """
+    Backend inference theo tên (Config.MODEL_BACKEND); artifact_dir/label khi
+    load 1 version trong MODEL_VERSIONS_DIR
+    """
+    if name not in MODEL_BACKENDS:
+        raise ValueError(f"Unknown model backend '{name}', expected one of {tuple(MODEL_BACKENDS)}")
+    return MODEL_BACKENDS[name](artifact_dir, label)
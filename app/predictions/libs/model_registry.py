@@ -0,0 +1,54 @@
+import os
+from typing import List, Optional
+
+from app.config import Config
+
+CURRENT_FILE = "CURRENT"
+
+
+def version_dir(version: str) -> str:
+    """Thư mục artifact của 1 version: MODEL_VERSIONS_DIR/<version>/"""
+    if not version or os.path.basename(version) != version or version.startswith("."):
+        raise ValueError(f"Invalid model version '{version}'")
+    return os.path.join(Config.MODEL_VERSIONS_DIR, version)
+
+
+def list_versions() -> List[str]:
+    if not os.path.isdir(Config.MODEL_VERSIONS_DIR):
+        return []
+    return sorted(
+        name for name in os.listdir(Config.MODEL_VERSIONS_DIR)
+        if os.path.isdir(os.path.join(Config.MODEL_VERSIONS_DIR, name)) and not name.startswith(".")
+    )
+
+
+def current_version() -> Optional[str]:
+    """
+    Version đang được chọn (nội dung file CURRENT), None nếu không dùng
+    thư mục versions (load trực tiếp MODEL_PATH/SCALER_PATH/...)
+    """
+    try:
+        with open(os.path.join(Config.MODEL_VERSIONS_DIR, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def check_version(version: str) -> None:
+    """
+    Raises:
+        ValueError: tên version không hợp lệ hoặc không có thư mục artifact
+    """
+    if not os.path.isdir(version_dir(version)):
+        raise ValueError(f"Model version '{version}' not found in {Config.MODEL_VERSIONS_DIR}")
+
+
+def set_current_version(version: str) -> None:
+    """Ghi CURRENT (atomic) để mọi worker chuyển sang version này"""
+    check_version(version)
+
+    path = os.path.join(Config.MODEL_VERSIONS_DIR, CURRENT_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(version)
+    os.replace(tmp_path, path)
@@ -0,0 +1,134 @@
+import json
+import numpy as np
+from typing import Dict, List
+
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    # sigmoid(x) = (1 + tanh(x/2)) / 2: ổn định số học và nhanh hơn 1/(1+exp(-x))
+    "sigmoid": lambda x: 0.5 * (1 + np.tanh(0.5 * x)),
+    "tanh": np.tanh,
+    "hard_sigmoid": lambda x: np.clip(0.2 * x + 0.5, 0, 1),
+}
+
+
+class NumpyCNNLSTM:
+    """
+    Forward pass NumPy cho model CNN-LSTM (không cần TensorFlow khi serving)
+
+    Weights và cấu hình từng layer được export từ file .keras bằng
+    model/export_numpy.py (npz gồm JSON "layers" + mảng "<i>/<tên weight>").
+    Scaler được gộp vào: input là feature chưa chuẩn hóa (n, 7). Hỗ trợ các
+    layer của model: Conv1D, BatchNormalization, MaxPooling1D, LSTM, Dense
+    (Dropout/InputLayer bị bỏ qua khi export). Tính bằng float64.
+    """
+
+    def __init__(self, layers: List[Dict], weights: Dict[str, np.ndarray], scaler_mean: np.ndarray, scaler_scale: np.ndarray):
+        self.layers = layers
+        self.weights = weights
+        self.scaler_mean = scaler_mean
+        self.scaler_scale = scaler_scale
+
+        for layer in layers:
+            if layer["type"] == "Conv1D" and (layer["padding"] not in ("same", "valid") or layer["strides"] != 1 or layer["dilation_rate"] != 1):
+                raise ValueError(f"Unsupported Conv1D configuration in layer {layer['name']}")
+            for key in ("activation", "recurrent_activation"):
+                if key in layer and layer[key] not in ACTIVATIONS:
+                    raise ValueError(f"Unsupported activation '{layer[key]}' in layer {layer['name']}")
+
+    @classmethod
+    def load(cls, path: str) -> "NumpyCNNLSTM":
+        with np.load(path, allow_pickle=False) as data:
+            layers = json.loads(str(data["layers"]))
+            weights = {key: data[key].astype(np.float64) for key in data.files if "/" in key}
+            return cls(layers, weights, data["scaler_mean"].astype(np.float64), data["scaler_scale"].astype(np.float64))
+
+    def _w(self, index: int, name: str) -> np.ndarray:
+        return self.weights[f"{index}/{name}"]
+
+    def _conv1d(self, x: np.ndarray, i: int, layer: Dict) -> np.ndarray:
+        kernel = self._w(i, "kernel")  # (k, in, out)
+        k = kernel.shape[0]
+        if layer["padding"] == "same":
+            x = np.pad(x, ((0, 0), ((k - 1) // 2, k // 2), (0, 0)))
+        steps = x.shape[1] - k + 1
+
+        # im2col: (n*steps, k*in) @ (k*in, out)
+        n = x.shape[0]
+        columns = np.concatenate([x[:, j:j + steps, :] for j in range(k)], axis=2)
+        out = (columns.reshape(n * steps, -1) @ kernel.reshape(-1, kernel.shape[2])).reshape(n, steps, -1)
+        if layer["use_bias"]:
+            out = out + self._w(i, "bias")
+        return ACTIVATIONS[layer["activation"]](out)
+
+    def _batch_norm(self, x: np.ndarray, i: int, layer: Dict) -> np.ndarray:
+        x = (x - self._w(i, "moving_mean")) / np.sqrt(self._w(i, "moving_variance") + layer["epsilon"])
+        if layer["scale"]:
+            x = x * self._w(i, "gamma")
+        if layer["center"]:
+            x = x + self._w(i, "beta")
+        return x
+
+    def _max_pool1d(self, x: np.ndarray, layer: Dict) -> np.ndarray:
+        pool, stride = layer["pool_size"], layer["strides"]
+        steps = (x.shape[1] - pool) // stride + 1
+        windows = [x[:, j:j + stride * (steps - 1) + 1:stride, :] for j in range(pool)]
+        return np.maximum.reduce(windows)
+
+    def _lstm(self, x: np.ndarray, i: int, layer: Dict) -> np.ndarray:
+        kernel, recurrent = self._w(i, "kernel"), self._w(i, "recurrent_kernel")
+        units = recurrent.shape[0]
+        activation = ACTIVATIONS[layer["activation"]]
+        recurrent_activation = ACTIVATIONS[layer["recurrent_activation"]]
+
+        # Input projection cho mọi timestep 1 lần (1 phép matmul 2-D); gate theo thứ tự Keras i, f, c, o
+        n, steps = x.shape[0], x.shape[1]
+        z_x = (x.reshape(n * steps, -1) @ kernel).reshape(n, steps, -1)
+        if layer["use_bias"]:
+            z_x = z_x + self._w(i, "bias")
+
+        h = np.zeros((n, units))
+        c = np.zeros((n, units))
+        outputs = np.empty((n, steps, units))
+        for t in range(steps):
+            z = z_x[:, t] + h @ recurrent
+            gate_i = recurrent_activation(z[:, :units])
+            gate_f = recurrent_activation(z[:, units:2 * units])
+            gate_o = recurrent_activation(z[:, 3 * units:])
+            c = gate_f * c + gate_i * activation(z[:, 2 * units:3 * units])
+            h = gate_o * activation(c)
+            outputs[:, t] = h
+
+        return outputs if layer["return_sequences"] else h
+
+    def _dense(self, x: np.ndarray, i: int, layer: Dict) -> np.ndarray:
+        out = x @ self._w(i, "kernel")
+        if layer["use_bias"]:
+            out = out + self._w(i, "bias")
+        return ACTIVATIONS[layer["activation"]](out)
+
+    def forward(self, X_scaled: np.ndarray) -> np.ndarray:
+        """X_scaled: (n, timesteps, 1) đã chuẩn hóa -> output layer cuối"""
+        x = X_scaled
+        for i, layer in enumerate(self.layers):
+            kind = layer["type"]
+            if kind == "Conv1D":
+                x = self._conv1d(x, i, layer)
+            elif kind == "BatchNormalization":
+                x = self._batch_norm(x, i, layer)
+            elif kind == "MaxPooling1D":
+                x = self._max_pool1d(x, layer)
+            elif kind == "LSTM":
+                x = self._lstm(x, i, layer)
+            elif kind == "Dense":
+                x = self._dense(x, i, layer)
+            else:
+                raise ValueError(f"Unsupported layer type '{kind}'")
+        return x
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """X: feature chưa chuẩn hóa (n, 7) -> xác suất (n,)"""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        X_scaled = (X - self.scaler_mean) / self.scaler_scale
+        return self.forward(X_scaled[:, :, np.newaxis])[:, 0]
@@ -0,0 +1,288 @@
+import numpy as np
+from scipy.signal import lfilter, lfilter_zi, sosfilt, sosfilt_zi
+from typing import Dict, List, Optional, Tuple
+
+from app.predictions.libs.ecg_classifier import ECGClassifier, filter_bank
+
+
+class StreamingECGClassifier:
+    """
+    Phân loại ECG theo từng chunk (vd. ESP32 gửi dần từng đoạn mẫu)
+
+    Mỗi chunk chỉ tốn công tỉ lệ với độ dài chunk: các bước của ECGClassifier
+    chạy ở dạng causal và giữ state giữa các lần gọi (lfilter/sosfilt zi,
+    thống kê chuẩn hóa luỹ kế, SPKI/NPKI của Pan-Tompkins, buffer beat).
+    Beat mới và thống kê ST/LVH rolling được trả về ngay khi có.
+
+    Thống kê rolling chỉ là ước lượng sớm: pipeline causal không có bước
+    median baseline removal và không lọc zero-phase như classify_ecg, nên có
+    thể lệch so với batch. Nhãn cuối cùng KHÔNG lấy từ state streaming mà
+    được tính lại bằng finalize(): chạy classify_ecg 1 lần trên buffer mẫu
+    raw - cùng nhãn với batch trên cùng đoạn tín hiệu. Buffer giữ tối đa
+    max_seconds giây gần nhất (bộ nhớ không tăng theo độ dài bản ghi);
+    bản ghi dài hơn thì finalize() báo lỗi, trừ khi gọi với
+    allow_truncated=True để chấp nhận nhãn chỉ tính trên đoạn cuối đó.
+    """
+
+    def __init__(self, sampling_rate: int = 250, adc_gain: float = 1.0, powerline: float = 50,
+                 classifier: Optional[ECGClassifier] = None, max_seconds: float = 600):
+        self.classifier = classifier or ECGClassifier.shared(sampling_rate=sampling_rate, adc_gain=adc_gain)
+        self.sampling_rate = self.classifier.sampling_rate
+        self.powerline = powerline
+
+        fs = self.sampling_rate
+        self._notch_b, self._notch_a = filter_bank.notch(fs, powerline, Q=30)
+        # sosfilt yêu cầu mảng sos ghi được; hệ số trong filter bank là read-only
+        self._bandpass_sos = filter_bank.butter_bandpass_sos(fs, order=4, cutoff=ECGClassifier.BANDPASS_CUTOFF).copy()
+        self._rms_window = int(0.25*fs)
+        self._energy_window = max(1, int(0.15*fs))
+        self._warmup_samples = int(0.25*fs)
+        self._min_rr = int(0.2*fs)
+        self._beat_length = int(0.8*fs)
+        self._max_raw_samples = max(1, int(max_seconds*fs))
+
+        self.reset()
+
+    def reset(self) -> None:
+        """Xóa toàn bộ state để bắt đầu bản ghi mới"""
+        self._raw_chunks: List[np.ndarray] = []
+        self._raw_samples = 0
+        self._raw_dropped = 0
+        self._n_samples = 0
+
+        # Filter state (khởi tạo theo mẫu đầu tiên ở chunk đầu)
+        self._notch_zi = None
+        self._bandpass_zi = None
+        self._rms_zi = None
+        self._energy_zi = None
+
+        # Thống kê luỹ kế cho artifact threshold và z-score
+        self._filtered_stats = np.zeros(3)  # count, sum, sum of squares
+        self._valid_stats = np.zeros(3)
+        self._last_normalized = 0.0
+
+        # Pan-Tompkins: [SPKI, NPKI, threshold] và raw peak gần nhất
+        self._threshold_state = np.zeros(3)
+        self._last_raw_peak: Optional[int] = None
+
+        # Beat buffer: đuôi tín hiệu đã chuẩn hóa + các peak chờ đủ mẫu
+        self._tail = np.zeros(0)
+        self._tail_start = 0
+        self._pending_peaks: List[int] = []
+        self._qrs_count = 0
+
+        # Thống kê ST/LVH rolling
+        self._num_beats = 0
+        self._st_abnormal_count = 0
+        self._st_amp_sum = 0.0
+        self._st_amp_min = np.inf
+        self._st_amp_max = -np.inf
+        self._beat_sum = np.zeros(self._beat_length)
+
+    @staticmethod
+    def _running_moments(values: np.ndarray, mask: np.ndarray, stats: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Mean/std luỹ kế tới từng mẫu (chỉ tính các mẫu mask), cập nhật stats tại chỗ"""
+        masked = np.where(mask, values, 0.0)
+        count = stats[0] + np.cumsum(mask)
+        total = stats[1] + np.cumsum(masked)
+        total_sq = stats[2] + np.cumsum(masked**2)
+        stats[:] = count[-1], total[-1], total_sq[-1]
+
+        safe_count = np.maximum(count, 1)
+        mean = total / safe_count
+        std = np.sqrt(np.maximum(total_sq / safe_count - mean**2, 0.0))
+        return mean, std
+
+    def _process_chunk(self, chunk: np.ndarray) -> np.ndarray:
+        """Notch, bandpass, artifact mask và z-score dạng causal"""
+        if self._notch_zi is None:
+            first = chunk[0]
+            self._notch_zi = lfilter_zi(self._notch_b, self._notch_a) * first
+            self._bandpass_zi = sosfilt_zi(self._bandpass_sos) * 0.0
+            self._rms_zi = np.zeros(max(self._rms_window - 1, 0))
+            self._energy_zi = np.zeros(self._energy_window - 1)
+
+        # 1-2. Notch + bandpass (Butterworth SOS, causal)
+        filtered, self._notch_zi = lfilter(self._notch_b, self._notch_a, chunk, zi=self._notch_zi)
+        filtered, self._bandpass_zi = sosfilt(self._bandpass_sos, filtered, zi=self._bandpass_zi)
+
+        # 4. Motion-artifact detection: RMS 250 ms so với 8 * std luỹ kế
+        _, std = self._running_moments(filtered, np.ones(len(filtered), dtype=bool), self._filtered_stats)
+        if self._rms_window > 1:
+            b = np.ones(self._rms_window) / self._rms_window
+            mean_sq, self._rms_zi = lfilter(b, 1, filtered**2, zi=self._rms_zi)
+            artifact = np.sqrt(mean_sq) > 8 * std
+            artifact &= std > 0
+            filtered[artifact] = np.nan
+
+        # 5. Z-score luỹ kế trên các mẫu hợp lệ
+        valid = ~np.isnan(filtered)
+        mean, std = self._running_moments(filtered, valid, self._valid_stats)
+        normalized = np.where(std > 0, (filtered - mean) / np.where(std > 0, std, 1.0), 0.0)
+        normalized[~valid] = np.nan
+        return normalized
+
+    def _detect_peaks(self, normalized: np.ndarray, offset: int) -> List[int]:
+        """Pan-Tompkins causal, trả về chỉ số QRS peak (theo tín hiệu) mới phát hiện"""
+        sig = np.where(np.isnan(normalized), 0.0, normalized)
+
+        # 1-3. Derivative, square, moving average 150 ms (causal)
+        diff = np.diff(sig, prepend=self._last_normalized)
+        self._last_normalized = sig[-1]
+        b = np.ones(self._energy_window) / self._energy_window
+        energy, self._energy_zi = lfilter(b, 1, diff**2, zi=self._energy_zi)
+
+        # Moving average causal trễ delay mẫu so với bản centered của batch
+        delay = self._energy_window // 2
+        raw_peaks = offset - delay + self.classifier._adaptive_threshold(
+            energy, self._warmup_samples, self._threshold_state, offset - delay
+        )
+
+        # 5. Minimum distance constraint (so với raw peak liền trước như batch)
+        peaks = []
+        for peak in raw_peaks.tolist():
+            if self._last_raw_peak is None or peak - self._last_raw_peak >= self._min_rr:
+                peaks.append(peak)
+            self._last_raw_peak = peak
+        return peaks
+
+    def _extract_ready_beats(self) -> Tuple[List[int], np.ndarray]:
+        """Cắt các beat đã đủ 2/3 beat length mẫu sau peak"""
+        after = 2 * self._beat_length // 3
+        ready = [p for p in self._pending_peaks if p + after <= self._n_samples]
+        self._pending_peaks = [p for p in self._pending_peaks if p + after > self._n_samples]
+
+        beats = self.classifier.extract_beats(self._tail, np.array(ready, dtype=int) - self._tail_start)
+        kept = [p for p in ready
+                if min(self._n_samples, p + after) - max(0, p - self._beat_length // 3) >= self._beat_length // 2]
+
+        # Chỉ giữ phần đuôi còn cần cho các peak đang chờ
+        keep_from = min([p - self._beat_length // 3 for p in self._pending_peaks] + [self._n_samples - self._beat_length])
+        keep_from = max(keep_from, self._tail_start, 0)
+        self._tail = self._tail[keep_from - self._tail_start:]
+        self._tail_start = keep_from
+        return kept, beats
+
+    def update(self, chunk) -> Dict:
+        """
+        Nhận chunk mẫu ECG mới (đơn vị ADC), trả về beat mới và thống kê rolling
+
+        Returns:
+            {"beats": [{"index", "samples", "st_abnormal", "st_amp", "status"}, ...],
+             "stats": self.stats()}
+        """
+        chunk = np.asarray(chunk, dtype=float).ravel()
+        if len(chunk) == 0:
+            return {"beats": [], "stats": self.stats()}
+
+        offset = self._n_samples
+        self._buffer_raw(chunk)
+
+        normalized = self._process_chunk(chunk)
+        self._n_samples += len(chunk)
+        self._tail = np.concatenate([self._tail, normalized])
+
+        new_peaks = self._detect_peaks(normalized, offset)
+        self._qrs_count += len(new_peaks)
+        self._pending_peaks.extend(new_peaks)
+
+        indices, beats = self._extract_ready_beats()
+        if len(beats) == 0:
+            return {"beats": [], "stats": self.stats()}
+
+        st_abnormal, st_amp, statuses = self.classifier.analyze_st_segments(beats, self.heart_rate)
+        self._num_beats += len(beats)
+        self._st_abnormal_count += int(np.sum(st_abnormal))
+        self._st_amp_sum += float(np.sum(st_amp))
+        self._st_amp_min = min(self._st_amp_min, float(np.min(st_amp)))
+        self._st_amp_max = max(self._st_amp_max, float(np.max(st_amp)))
+        self._beat_sum += beats.sum(axis=0)
+
+        new_beats = [
+            {
+                "index": index,
+                "samples": beat,
+                "st_abnormal": bool(abnormal),
+                "st_amp": float(amp),
+                "status": status
+            }
+            for index, beat, abnormal, amp, status in zip(indices, beats, st_abnormal, st_amp, statuses)
+        ]
+        return {"beats": new_beats, "stats": self.stats()}
+
+    def _buffer_raw(self, chunk: np.ndarray) -> None:
+        """Giữ tối đa _max_raw_samples mẫu raw gần nhất cho finalize()"""
+        self._raw_chunks.append(chunk)
+        self._raw_samples += len(chunk)
+        excess = self._raw_samples - self._max_raw_samples
+        while excess > 0:
+            first = self._raw_chunks[0]
+            if len(first) <= excess:
+                self._raw_chunks.pop(0)
+                dropped = len(first)
+            else:
+                self._raw_chunks[0] = first[excess:]
+                dropped = excess
+            self._raw_samples -= dropped
+            self._raw_dropped += dropped
+            excess -= dropped
+
+    @property
+    def heart_rate(self) -> float:
+        duration = self._n_samples / self.sampling_rate
+        return self._qrs_count * 60 / duration if duration > 0 else 0.0
+
+    def stats(self) -> Dict:
+        """Thống kê ST/LVH rolling trên các beat đã nhận"""
+        if self._num_beats == 0:
+            return {
+                "num_beats": 0,
+                "qrs_peaks": self._qrs_count,
+                "heart_rate": self.heart_rate,
+                "duration": self._n_samples / self.sampling_rate
+            }
+
+        # LVH trên beat trung bình rolling
+        avg_beat = self._beat_sum / self._num_beats
+        lvh_detected, voltage_score, lvh_status = self.classifier.analyze_lvh_criteria(avg_beat[np.newaxis, :])
+
+        return {
+            "num_beats": self._num_beats,
+            "qrs_peaks": self._qrs_count,
+            "heart_rate": self.heart_rate,
+            "duration": self._n_samples / self.sampling_rate,
+            "st_abnormal_count": self._st_abnormal_count,
+            "st_abnormal_ratio": self._st_abnormal_count / self._num_beats,
+            "avg_st_elevation": self._st_amp_sum / self._num_beats,
+            "st_elevation_range": [self._st_amp_min, self._st_amp_max],
+            "lvh_detected": lvh_detected,
+            "voltage_score": voltage_score,
+            "lvh_status": lvh_status
+        }
+
+    def finalize(self, allow_truncated: bool = False) -> Tuple[int, Dict]:
+        """
+        Nhãn cuối cùng: tính lại bằng classify_ecg (batch) trên buffer mẫu raw;
+        không dùng state streaming
+
+        details["recomputed"] ghi số mẫu đã dùng và số mẫu cũ đã bị bỏ khỏi buffer,
+        details["truncated"] cho biết nhãn chỉ tính trên max_seconds giây cuối.
+
+        Raises:
+            ValueError: bản ghi dài hơn max_seconds và allow_truncated=False
+        """
+        if not self._raw_chunks:
+            return 0, {"error": "No ECG samples received"}
+        if self._raw_dropped and not allow_truncated:
+            raise ValueError(
+                f"Recording exceeds max_seconds ({self._max_raw_samples} samples); "
+                f"{self._raw_dropped} samples were dropped, pass allow_truncated=True to label the tail"
+            )
+
+        signal = np.concatenate(self._raw_chunks)
+        self._raw_chunks = [signal]
+        label, details = self.classifier.classify_ecg(signal)
+        details["recomputed"] = {"samples": len(signal), "dropped_samples": self._raw_dropped}
+        details["truncated"] = self._raw_dropped > 0
+        details["streaming"] = self.stats()
+        return label, details
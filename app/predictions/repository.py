@@ -1,14 +1,19 @@
+from datetime import datetime, timedelta
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
-from typing import Optional, List
-from app.predictions.entity import Prediction
+from typing import Optional, List, Dict, Iterator, Tuple
+from app.metrics import stage_timer
+from app.pagination import Cursor, keyset_page
+from app.predictions.entity import Prediction, PredictionJob
 
 class PredictionRepository:
     def __init__(self, db: Session):
         self.db = db
 
     def create(self, prediction: Prediction) -> Prediction:
-        self.db.add(prediction)
-        self.db.commit()
+        with stage_timer("db_write"):
+            self.db.add(prediction)
+            self.db.commit()
         self.db.refresh(prediction)
         return prediction
 
@@ -21,6 +26,172 @@ class PredictionRepository:
     def get_all(self) -> List[Prediction]:
         return self.db.query(Prediction).all()
 
+    def get_page_by_user_id(self, user_id: int, limit: int,
+                            cursor: Optional[Cursor] = None) -> Tuple[List[Prediction], Optional[str]]:
+        query = self.db.query(Prediction).filter(Prediction.user_id == user_id)
+        return keyset_page(query, Prediction.created_at, Prediction.id, limit, cursor)
+
+    def get_page(self, limit: int, cursor: Optional[Cursor] = None) -> Tuple[List[Prediction], Optional[str]]:
+        return keyset_page(self.db.query(Prediction), Prediction.created_at, Prediction.id, limit, cursor)
+
     def delete(self, prediction: Prediction) -> None:
         self.db.delete(prediction)
-        self.db.commit()
\ No newline at end of file
+        self.db.commit()
+
+    def get_id_bounds(self) -> Tuple[Optional[int], Optional[int]]:
+        return self.db.query(func.min(Prediction.id), func.max(Prediction.id)).one()
+
+    def stream_features(self, start_id: int, end_id: int, chunk_size: int = 2000) -> Iterator[Tuple]:
+        """Stream (id, 7 feature) theo id tăng dần bằng server-side cursor"""
+        return (
+            self.db.query(
+                Prediction.id, Prediction.age, Prediction.sex, Prediction.cp, Prediction.trestbps,
+                Prediction.restecg, Prediction.thalach, Prediction.exang
+            )
+            .filter(Prediction.id >= start_id, Prediction.id <= end_id)
+            .order_by(Prediction.id)
+            .execution_options(stream_results=True)
+            .yield_per(chunk_size)
+        )
+
+    def stream_columns(self, columns: List, user_id: Optional[int] = None, chunk_size: int = 2000) -> Iterator[Tuple]:
+        """Stream các cột `columns` (tuple, không tạo ORM object) theo id tăng dần bằng server-side cursor"""
+        query = self.db.query(*columns)
+        if user_id is not None:
+            query = query.filter(Prediction.user_id == user_id)
+        return (
+            query.order_by(Prediction.id)
+            .execution_options(stream_results=True)
+            .yield_per(chunk_size)
+        )
+
+    # ===== Analytics (aggregate trong SQL, không load dòng nào lên Python) =====
+
+    @staticmethod
+    def _positive():
+        return func.sum(case((Prediction.prediction == "POSITIVE", 1), else_=0))
+
+    def count_summary(self) -> Tuple:
+        """(total, positive, số user, probability trung bình)"""
+        return self.db.query(
+            func.count(Prediction.id),
+            self._positive(),
+            func.count(func.distinct(Prediction.user_id)),
+            func.avg(Prediction.probability)
+        ).one()
+
+    def count_by_day(self, since: datetime) -> List[Tuple]:
+        """[(ngày, total, positive)] từ `since` (range trên index created_at)"""
+        day = func.date(Prediction.created_at)
+        return (
+            self.db.query(day, func.count(Prediction.id), self._positive())
+            .filter(Prediction.created_at >= since)
+            .group_by(day)
+            .order_by(day)
+            .all()
+        )
+
+    def count_by_restecg(self) -> List[Tuple]:
+        """[(restecg, total, positive)]"""
+        return (
+            self.db.query(Prediction.restecg, func.count(Prediction.id), self._positive())
+            .group_by(Prediction.restecg)
+            .order_by(Prediction.restecg)
+            .all()
+        )
+
+    def probability_histogram(self, bins: int) -> List[Tuple]:
+        """
+        [(bin, restecg, count)] với bin = floor(probability * bins) (probability = 1 vào bin cuối)
+
+        Dùng CASE theo ngưỡng thay vì CAST/floor vì CAST sang integer làm tròn
+        trên PostgreSQL nhưng cắt trên SQLite. GROUP BY theo label: biểu thức
+        CASE có bind parameter nên PostgreSQL không khớp được 2 bản của nó
+        """
+        if bins == 1:
+            # CASE không có nhánh WHEN nào không hợp lệ: 1 bin = đếm theo restecg
+            rows = self.db.query(Prediction.restecg, func.count(Prediction.id)).group_by(Prediction.restecg).all()
+            return [(0, restecg, count) for restecg, count in rows]
+
+        bucket = case(
+            *[(Prediction.probability < (i + 1) / bins, i) for i in range(bins - 1)],
+            else_=bins - 1
+        ).label("bin")
+        return (
+            self.db.query(bucket, Prediction.restecg, func.count(Prediction.id))
+            .group_by("bin", Prediction.restecg)
+            .all()
+        )
+
+    def bulk_update_scores(self, scores: List[Dict]) -> None:
+        """scores: [{"id", "probability", "prediction"}, ...] - 1 executemany UPDATE"""
+        self.db.bulk_update_mappings(Prediction, scores)
+        self.db.commit()
+
+
+class PredictionJobRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, job: PredictionJob) -> PredictionJob:
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def get_by_id(self, job_id: str) -> Optional[PredictionJob]:
+        return self.db.query(PredictionJob).filter(PredictionJob.id == job_id).first()
+
+    def update_status(self, job_id: str, status: str, prediction_id: Optional[int] = None,
+                      error: Optional[str] = None) -> bool:
+        """
+        Chuyển trạng thái theo đúng thứ tự queued -> running -> succeeded/failed;
+        job đã bị fail_stale đánh dấu failed thì giữ nguyên
+
+        Returns:
+            False nếu job không còn ở trạng thái trước đó
+        """
+        values = {PredictionJob.status: status}
+        if status in ("succeeded", "failed"):
+            values.update({
+                PredictionJob.prediction_id: prediction_id,
+                PredictionJob.error: error,
+                PredictionJob.finished_at: func.now()
+            })
+        previous = "queued" if status == "running" else "running"
+        count = self.db.query(PredictionJob).filter(
+            PredictionJob.id == job_id,
+            PredictionJob.status == previous
+        ).update(values, synchronize_session=False)
+        self.db.commit()
+        return count > 0
+
+    def _stale_cutoff(self, timeout: float) -> datetime:
+        # Đồng hồ của DB, cùng nguồn với created_at
+        return self.db.query(func.now()).scalar() - timedelta(seconds=timeout)
+
+    def is_stale(self, job: PredictionJob, timeout: float) -> bool:
+        """Job queued/running tạo quá timeout giây trước; chỉ đọc, không ghi"""
+        return job.status in ("queued", "running") and job.created_at < self._stale_cutoff(timeout)
+
+    def fail_stale(self, timeout: float, job_id: Optional[str] = None) -> int:
+        """
+        Job queued/running tạo quá timeout giây trước -> failed (job bị mất khi process
+        chạy nó dừng)
+
+        Returns:
+            số job bị đánh dấu failed
+        """
+        query = self.db.query(PredictionJob).filter(
+            PredictionJob.status.in_(("queued", "running")),
+            PredictionJob.created_at < self._stale_cutoff(timeout)
+        )
+        if job_id is not None:
+            query = query.filter(PredictionJob.id == job_id)
+        count = query.update({
+            PredictionJob.status: "failed",
+            PredictionJob.error: f"Job did not finish within {timeout:g}s (worker stopped?)",
+            PredictionJob.finished_at: func.now()
+        }, synchronize_session=False)
+        self.db.commit()
+        return count
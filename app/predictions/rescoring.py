@@ -0,0 +1,198 @@
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from app.database import SessionLocal
+from app.predictions.repository import PredictionRepository
+
+
+def split_id_range(min_id: int, max_id: int, parts: int) -> List[Tuple[int, int]]:
+    """Chia [min_id, max_id] thành tối đa `parts` đoạn liên tiếp (bao gồm 2 đầu)"""
+    parts = max(1, min(parts, max_id - min_id + 1))
+    step = (max_id - min_id + 1) / parts
+    bounds = [min_id + round(i * step) for i in range(parts)] + [max_id + 1]
+    return [(bounds[i], bounds[i + 1] - 1) for i in range(parts)]
+
+
+class RescoreCheckpoint:
+    """
+    File JSON lưu id cuối cùng đã ghi của 1 đoạn id, để chạy tiếp sau khi bị ngắt
+    """
+
+    def __init__(self, directory: str, start_id: int, end_id: int):
+        self.path = os.path.join(directory, f"rescore_{start_id}_{end_id}.json")
+
+    def load(self) -> Optional[Dict]:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path) as f:
+            return json.load(f)
+
+    def save(self, last_id: int, rows: int, model_version: str) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"last_id": last_id, "rows": rows, "model_version": model_version}, f)
+        os.replace(tmp_path, self.path)
+
+
+def load_plan(checkpoint_dir: str, plan: Dict, dry_run: bool = False) -> List[Tuple[int, int]]:
+    """
+    Cách chia đoạn id của lần chạy trước (rescore_plan.json) nếu cùng tham số,
+    cùng khoảng id và cùng model version; lần chạy đầu thì ghi plan mới
+
+    Checkpoint của từng đoạn chỉ dùng lại được với đúng cách chia đoạn cũ, nên
+    plan không khớp (đổi --start-id/--end-id/--workers, có thêm dòng mới, đổi
+    model) không được âm thầm thay bằng plan cũ.
+
+    Raises:
+        ValueError: plan cũ không khớp lần chạy này (chạy lại với --reset)
+    """
+    plan_path = os.path.join(checkpoint_dir, "rescore_plan.json")
+    if os.path.exists(plan_path):
+        with open(plan_path) as f:
+            saved = json.load(f)
+        changed = [key for key in plan if key != "ranges" and saved.get(key) != plan[key]]
+        if changed:
+            details = ", ".join(f"{key}: {saved.get(key)} -> {plan[key]}" for key in changed)
+            raise ValueError(f"{plan_path} was created for a different run ({details}); "
+                             f"rerun with the original options or use --reset")
+        return [tuple(r) for r in saved["ranges"]]
+
+    if not dry_run:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        with open(plan_path, "w") as f:
+            json.dump(plan, f)
+    return plan["ranges"]
+
+
+def rescore_range(start_id: int, end_id: int, chunk_size: int = 2000, checkpoint_dir: Optional[str] = None,
+                  dry_run: bool = False) -> Dict:
+    """
+    Chấm lại điểm các prediction có id trong [start_id, end_id] bằng model hiện tại
+
+    Đọc bằng server-side cursor (yield_per) trên 1 session, mỗi chunk chạy
+    1 lần predict_batch và ghi bằng bulk UPDATE + commit trên session khác
+    (commit không đóng cursor đang stream). Sau mỗi chunk lưu checkpoint.
+    """
+    from app.predictions.libs.heart_disease_model import HeartDiseaseModel
+
+    model = HeartDiseaseModel()
+    model.load()
+    model_version = model.model_version
+
+    checkpoint = RescoreCheckpoint(checkpoint_dir, start_id, end_id) if checkpoint_dir else None
+    state = checkpoint.load() if checkpoint else None
+    resume_from = state["last_id"] + 1 if state and state.get("model_version") == model_version else start_id
+    rows = state["rows"] if resume_from != start_id else 0
+
+    read_session = SessionLocal()
+    write_session = SessionLocal()
+    write_repo = PredictionRepository(write_session)
+    started = time.perf_counter()
+    scored = 0
+
+    def flush(chunk: List[Tuple]) -> None:
+        nonlocal rows, scored
+        results = model.predict_batch_versioned([row[1:] for row in chunk])
+        scores = [
+            {"id": row[0], "probability": probability, "prediction": label, "model_version": version}
+            for row, (probability, label, version) in zip(chunk, results)
+        ]
+        if not dry_run:
+            write_repo.bulk_update_scores(scores)
+        rows += len(chunk)
+        scored += len(chunk)
+        if checkpoint and not dry_run:
+            checkpoint.save(chunk[-1][0], rows, model_version)
+
+    try:
+        chunk = []
+        for row in PredictionRepository(read_session).stream_features(resume_from, end_id, chunk_size):
+            chunk.append(tuple(row))
+            if len(chunk) >= chunk_size:
+                flush(chunk)
+                chunk = []
+        if chunk:
+            flush(chunk)
+    finally:
+        read_session.close()
+        write_session.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "start_id": start_id,
+        "end_id": end_id,
+        "resumed_from": resume_from,
+        "rows": scored,
+        "total_rows": rows,
+        "seconds": elapsed,
+        "rows_per_second": scored / elapsed if elapsed > 0 else 0.0,
+        "model_version": model_version
+    }
+
+
+def rescore_predictions(workers: int = 1, chunk_size: int = 2000, start_id: Optional[int] = None,
+                        end_id: Optional[int] = None, checkpoint_dir: Optional[str] = None,
+                        dry_run: bool = False, progress=None) -> Dict:
+    """
+    Chấm lại toàn bộ (hoặc 1 đoạn id) bảng predictions, song song theo đoạn id trên `workers` process
+    """
+    session = SessionLocal()
+    try:
+        min_id, max_id = PredictionRepository(session).get_id_bounds()
+    finally:
+        session.close()
+
+    if min_id is None:
+        return {"rows": 0, "seconds": 0.0, "rows_per_second": 0.0, "ranges": []}
+
+    first_id = max(min_id, start_id) if start_id is not None else min_id
+    last_id = min(max_id, end_id) if end_id is not None else max_id
+    ranges = split_id_range(first_id, last_id, workers)
+
+    # Giữ nguyên cách chia đoạn của lần chạy trước để checkpoint từng đoạn còn dùng được
+    if checkpoint_dir:
+        from app.predictions.libs.heart_disease_model import HeartDiseaseModel
+
+        plan = {
+            "workers": workers,
+            "start_id": start_id,
+            "end_id": end_id,
+            "first_id": first_id,
+            "last_id": last_id,
+            "model_version": HeartDiseaseModel.artifact_version(),
+            "ranges": ranges
+        }
+        ranges = load_plan(checkpoint_dir, plan, dry_run)
+    args = [(first, last, chunk_size, checkpoint_dir, dry_run) for first, last in ranges]
+
+    started = time.perf_counter()
+    if len(ranges) == 1:
+        results = [rescore_range(*args[0])]
+        if progress:
+            progress(results[0])
+    else:
+        # Không fork trực tiếp (process cha có thể đã có thread / TensorFlow): worker
+        # import lại module và tự tạo engine + connection pool riêng
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        context = multiprocessing.get_context(start_method)
+        with ProcessPoolExecutor(len(ranges), mp_context=context) as pool:
+            futures = [pool.submit(rescore_range, *arg) for arg in args]
+            results = []
+            for future in futures:
+                results.append(future.result())
+                if progress:
+                    progress(results[-1])
+    elapsed = time.perf_counter() - started
+
+    rows = sum(result["rows"] for result in results)
+    return {
+        "rows": rows,
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed if elapsed > 0 else 0.0,
+        "ranges": results
+    }
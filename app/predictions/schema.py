@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 class HeartDiseaseInput(BaseModel):
@@ -52,6 +52,7 @@ class PredictionResponse(BaseModel):
     # Prediction results
     probability: float = Field(..., ge=0.0, le=1.0, description="Probability of having heart disease")
     prediction: str = Field(..., description="Prediction result (POSITIVE or NEGATIVE)")
+    model_version: Optional[str] = Field(None, description="Model artifact version that produced the prediction")
     created_at: datetime = Field(..., description="Timestamp when the prediction was created")
     
     class Config:
@@ -69,6 +70,7 @@ class PredictionResponse(BaseModel):
                 "exang": 0,
                 "probability": 0.75,
                 "prediction": "POSITIVE",
+                "model_version": "v2/numpy:3f2a9c1d8e7b",
                 "created_at": "2024-01-15T10:30:00"
             }
         }
\ No newline at end of file
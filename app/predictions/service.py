@@ -1,16 +1,19 @@
 from sqlalchemy.orm import Session
 from typing import Dict, List, Tuple, Optional
 import numpy as np
+from datetime import datetime, timedelta
+from app.config import Config
+from app.metrics import observe_stage
+from app.pagination import Cursor
 from app.predictions.schema import HeartDiseaseInput
-from app.predictions.libs.heart_disease_model import HeartDiseaseModel
-from app.predictions.libs.ecg_classifier import ECGClassifier
-from app.predictions.entity import Prediction
-from app.predictions.repository import PredictionRepository
+from app.predictions.entity import Prediction, PredictionJob
+from app.predictions.repository import PredictionRepository, PredictionJobRepository
 from app.users.repository import UserRepository
 
 class PredictionService:
     def __init__(self, db: Session):
         self.repo = PredictionRepository(db)
+        self.job_repo = PredictionJobRepository(db)
         self.user_repo = UserRepository(db)
 
     def predict_heart_disease(self, input_data: HeartDiseaseInput, user_id: int) -> Tuple[Optional[Prediction], Optional[Dict[str, str]]]:
@@ -19,11 +22,15 @@ class PredictionService:
         if not user:
             return None, {"error": "User not found"}
         
+        # ML stack (scipy/numba, model backend) chỉ được import ở request dự đoán đầu tiên
+        from app.predictions.libs.heart_disease_model import HeartDiseaseModel
+        from app.predictions.libs.ecg_executor import ECGExecutor
+
         # Process ECG signal to get restecg value
         try:
-            ecg_classifier = ECGClassifier()
             ecg_signal = np.array(input_data.ecg)
-            restecg_value, _ = ecg_classifier.classify_ecg(ecg_signal)
+            restecg_value, ecg_info = ECGExecutor.shared().classify_ecg(ecg_signal)
+            observe_stage("ecg_dsp", ecg_info.get("processing_time", 0.0))
         except Exception as e:
             return None, {"error": f"ECG processing error: {str(e)}"}
             
@@ -40,7 +47,7 @@ class PredictionService:
         
         try:
             model = HeartDiseaseModel()
-            probability, prediction_result = model.predict(features)
+            probability, prediction_result, model_version = model.predict_versioned(features)
         except Exception as e:
             return None, {"error": f"Prediction model error: {str(e)}"}
         
@@ -55,7 +62,8 @@ class PredictionService:
             thalach=input_data.thalach,
             exang=input_data.exang,
             probability=probability,
-            prediction=prediction_result
+            prediction=prediction_result,
+            model_version=model_version
         )
         
         try:
@@ -64,15 +72,81 @@ class PredictionService:
         except Exception as e:
             return None, {"error": f"Database error: {str(e)}"}
         
+    def enqueue_prediction(self, input_data: HeartDiseaseInput, user_id: int) -> Tuple[Optional[PredictionJob], Optional[Dict[str, str]]]:
+        """
+        Tạo job async (202); predict_heart_disease chạy trên PredictionJobQueue
+
+        Raises:
+            JobQueueFull: đã có PREDICTION_JOB_MAX_PENDING job chờ/chạy
+        """
+        from app.predictions.jobs import JobQueueFull, PredictionJobQueue
+
+        if not self.user_repo.get_by_id(user_id):
+            return None, {"error": "User not found"}
+
+        try:
+            return PredictionJobQueue.shared().submit(self.job_repo.db, input_data, user_id), None
+        except JobQueueFull:
+            raise
+        except Exception as e:
+            return None, {"error": f"Database error: {str(e)}"}
+
+    def get_job(self, job_id: str) -> Optional[PredictionJob]:
+        job = self.job_repo.get_by_id(job_id)
+        # Chỉ ghi khi job thực sự quá hạn; job đang chờ bình thường chỉ tốn 1 SELECT now()
+        if job is not None and self.job_repo.is_stale(job, Config.PREDICTION_JOB_TIMEOUT):
+            if self.job_repo.fail_stale(Config.PREDICTION_JOB_TIMEOUT, job_id):
+                self.job_repo.db.refresh(job)
+        return job
+
     def get_prediction(self, prediction_id: int) -> Optional[Prediction]:
         return self.repo.get_by_id(prediction_id)
         
-    def get_user_predictions(self, user_id: int) -> List[Prediction]:
-        return self.repo.get_by_user_id(user_id)
+    def get_user_predictions(self, user_id: int, limit: int, cursor: Optional[Cursor] = None) -> Tuple[List[Prediction], Optional[str]]:
+        return self.repo.get_page_by_user_id(user_id, limit, cursor)
         
-    def get_all_predictions(self) -> List[Prediction]:
-        return self.repo.get_all()
+    def get_all_predictions(self, limit: int, cursor: Optional[Cursor] = None) -> Tuple[List[Prediction], Optional[str]]:
+        return self.repo.get_page(limit, cursor)
         
+    def get_analytics(self, days: int = 30, bins: int = 10) -> Dict:
+        """Thống kê predictions cho admin, mọi con số đều tính bằng aggregate query"""
+        total, positive, users, avg_probability = self.repo.count_summary()
+        positive = int(positive or 0)
+
+        since = datetime.combine(datetime.now().date() - timedelta(days=days - 1), datetime.min.time())
+        by_day = [
+            {"date": str(day), "total": count, "positive": int(day_positive), "positive_rate": int(day_positive) / count}
+            for day, count, day_positive in self.repo.count_by_day(since)
+        ]
+
+        restecg_distribution = [
+            {"restecg": restecg, "total": count, "positive": int(restecg_positive),
+             "share": count / total, "positive_rate": int(restecg_positive) / count}
+            for restecg, count, restecg_positive in self.repo.count_by_restecg()
+        ]
+
+        histogram = [
+            {"lower": i / bins, "upper": (i + 1) / bins, "count": 0, "by_restecg": {}}
+            for i in range(bins)
+        ]
+        for bucket, restecg, count in self.repo.probability_histogram(bins):
+            histogram[bucket]["count"] += count
+            histogram[bucket]["by_restecg"][str(restecg)] = count
+
+        return {
+            "counts": {
+                "total": total,
+                "positive": positive,
+                "negative": total - positive,
+                "positive_rate": positive / total if total else 0.0,
+                "users": users,
+                "avg_probability": float(avg_probability) if avg_probability is not None else None
+            },
+            "positive_rate_by_day": {"since": since.date().isoformat(), "days": by_day},
+            "restecg_distribution": restecg_distribution,
+            "probability_histogram": histogram
+        }
+
     def delete_prediction(self, prediction_id: int) -> bool:
         prediction = self.repo.get_by_id(prediction_id)
         if prediction:
@@ -82,4 +156,35 @@ class PredictionService:
             except Exception as e:
                 print(f"Error deleting prediction: {str(e)}")
                 return False
-        return False
\ No newline at end of file
+        return False
+
+    @staticmethod
+    def get_model_status() -> Dict:
+        from app.predictions.libs.heart_disease_model import HeartDiseaseModel
+        from app.predictions.libs.model_registry import list_versions
+
+        status = HeartDiseaseModel().status()
+        status["available_versions"] = list_versions()
+        return status
+
+    @staticmethod
+    def reload_model(version: Optional[str] = None) -> Tuple[Optional[Dict], Optional[Dict[str, str]]]:
+        """
+        Hot-swap model ở worker này; nếu có version thì CURRENT chỉ được ghi sau khi
+        version đó load + warm-up thành công, lúc đó các worker khác mới chuyển theo
+
+        Raises:
+            ModelSwapInProgress: đang có 1 lần swap khác
+        """
+        from app.predictions.libs.heart_disease_model import HeartDiseaseModel
+        from app.predictions.libs.model_registry import check_version
+
+        if version is not None:
+            try:
+                check_version(version)
+            except ValueError as e:
+                return None, {"error": str(e)}
+
+        model = HeartDiseaseModel()
+        model.reload(version, persist=True)
+        return model.status(), None
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify, g
 from app.users.service import UserService
 from app.users.schema import UserCreateSchema, UserOutSchema, UserUpdateSchema, UserHealthUpdateSchema, ChangePasswordSchema
 from app.auth.controller import jwt_required
+from app.pagination import parse_page_args
 
 user_bp = Blueprint("users", __name__)
 
@@ -33,9 +34,17 @@ def list_users():
     if g.current_user.get('role') != 'admin':
         return jsonify({"error": "Admin access required"}), 403
         
+    try:
+        limit, cursor = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+        
     service = UserService(g.db)
-    users = service.list_users()
-    return jsonify([UserOutSchema.from_orm(u).dict() for u in users]), 200
+    users, next_cursor = service.list_users(limit, cursor)
+    return jsonify({
+        "items": [UserOutSchema.from_orm(u).dict() for u in users],
+        "next_cursor": next_cursor
+    }), 200
 
 @user_bp.route("/<int:user_id>", methods=["GET"])
 @jwt_required
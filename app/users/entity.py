@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Date
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Date, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Phân trang danh sách user (admin)
+        Index("ix_users_created_at", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     username = Column(String, nullable=False, unique=True)
@@ -26,4 +30,7 @@ class User(Base):
     otps = relationship("OTP", back_populates="user", cascade="all, delete-orphan")
     
     # Relationship to Prediction
-    predictions = relationship("Prediction", back_populates="user", cascade="all, delete-orphan")
\ No newline at end of file
+    predictions = relationship("Prediction", back_populates="user", cascade="all, delete-orphan")
+    
+    # Relationship to async prediction jobs
+    prediction_jobs = relationship("PredictionJob", back_populates="user", cascade="all, delete-orphan")
\ No newline at end of file
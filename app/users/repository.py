@@ -1,5 +1,7 @@
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
+from app.pagination import Cursor, keyset_page
 from app.users.entity import User
 
 class UserRepository:
@@ -29,6 +31,9 @@ class UserRepository:
     def get_all(self) -> List[User]:
         return self.db.query(User).all()
 
+    def get_page(self, limit: int, cursor: Optional[Cursor] = None) -> Tuple[List[User], Optional[str]]:
+        return keyset_page(self.db.query(User), User.created_at, User.id, limit, cursor)
+
     def update(self, user: User) -> User:
         self.db.commit()
         self.db.refresh(user)
@@ -54,4 +59,26 @@ class UserRepository:
             (User.cp.isnot(None)) |
             (User.trestbps.isnot(None)) |
             (User.exang.isnot(None))
-        ).all()
\ No newline at end of file
+        ).all()
+
+    def get_statistics(self) -> Dict[str, int]:
+        """Đếm user theo trạng thái / role / dữ liệu sức khỏe bằng 1 query aggregate"""
+        has_health_data = (
+            (User.dob.isnot(None)) |
+            (User.sex.isnot(None)) |
+            (User.cp.isnot(None)) |
+            (User.trestbps.isnot(None)) |
+            (User.exang.isnot(None))
+        )
+        total, verified, admins, with_health_data = self.db.query(
+            func.count(User.id),
+            func.sum(case((User.is_verified == True, 1), else_=0)),
+            func.sum(case((User.role == 'admin', 1), else_=0)),
+            func.sum(case((has_health_data, 1), else_=0))
+        ).one()
+        return {
+            "total": total,
+            "verified": int(verified or 0),
+            "admins": int(admins or 0),
+            "with_health_data": int(with_health_data or 0)
+        }
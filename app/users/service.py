@@ -1,6 +1,8 @@
 from sqlalchemy.orm import Session
 from typing import Optional, List, Dict, Any, Tuple
 import bcrypt
+from app.metrics import stage_timer
+from app.pagination import Cursor
 from app.users.repository import UserRepository
 from app.users.entity import User
 from app.users.schema import UserCreateSchema, UserUpdateSchema, UserHealthUpdateSchema
@@ -11,12 +13,14 @@ class UserService:
 
     def _hash_password(self, password: str) -> str:
         """Hash password using bcrypt"""
-        salt = bcrypt.gensalt()
-        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        with stage_timer("password_hash"):
+            salt = bcrypt.gensalt()
+            return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
 
     def _verify_password(self, password: str, hashed: str) -> bool:
         """Verify password against hash"""
-        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+        with stage_timer("password_verify"):
+            return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
     def create_user(self, data: UserCreateSchema) -> Tuple[Optional[User], Optional[Dict[str, str]]]:
         """Create a new user - typically called by admin"""
@@ -55,9 +59,9 @@ class UserService:
         """Get user by ID"""
         return self.repo.get_by_id(user_id)
 
-    def list_users(self) -> List[User]:
-        """List all users - admin only"""
-        return self.repo.get_all()
+    def list_users(self, limit: int, cursor: Optional[Cursor] = None) -> Tuple[List[User], Optional[str]]:
+        """List users page by page (newest first) - admin only"""
+        return self.repo.get_page(limit, cursor)
 
     def update_user(self, user_id: int, data: UserUpdateSchema, current_user_role: str = "user") -> Tuple[Optional[User], Optional[Dict[str, str]]]:
         """Update user with role-based restrictions"""
@@ -149,16 +153,13 @@ class UserService:
 
     def get_user_statistics(self) -> Dict[str, int]:
         """Get user statistics - admin only"""
-        all_users = self.repo.get_all()
-        verified_users = [u for u in all_users if u.is_verified]
-        admin_users = [u for u in all_users if u.role == 'admin']
-        users_with_health_data = self.repo.get_users_with_health_data()
+        stats = self.repo.get_statistics()
         
         return {
-            "total_users": len(all_users),
-            "verified_users": len(verified_users),
-            "unverified_users": len(all_users) - len(verified_users),
-            "admin_users": len(admin_users),
-            "regular_users": len(all_users) - len(admin_users),
-            "users_with_health_data": len(users_with_health_data)
+            "total_users": stats["total"],
+            "verified_users": stats["verified"],
+            "unverified_users": stats["total"] - stats["verified"],
+            "admin_users": stats["admins"],
+            "regular_users": stats["total"] - stats["admins"],
+            "users_with_health_data": stats["with_health_data"]
         }
\ No newline at end of file
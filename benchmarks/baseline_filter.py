@@ -0,0 +1,45 @@
+"""
+Benchmark baseline wander removal (bước 3 của preprocess_ecg):
+scipy.signal.medfilt so với running median ndimage.median_filter.
+
+    python -m benchmarks.baseline_filter
+"""
+import sys
+import numpy as np
+import scipy
+from scipy.signal import medfilt
+from scipy.ndimage import median_filter
+
+from benchmarks.synthetic import synthetic_ecg
+from benchmarks.timing import best_of
+
+DURATIONS = [("10s", 10), ("60s", 60), ("10min", 600)]
+
+
+def main() -> int:
+    failed = False
+    print(f"scipy {scipy.__version__}")
+    print(f"{'fs':>4} {'signal':>7} {'kernel':>6} {'medfilt':>10} {'running':>10} {'speedup':>8} parity")
+    for fs in (250, 500):
+        kernel_size = int(0.2*fs)
+        if kernel_size % 2 == 0:
+            kernel_size += 1
+
+        for label, duration in DURATIONS:
+            signal = synthetic_ecg(duration, fs)
+            signal = (signal - signal.mean()) / signal.std()
+            same = np.array_equal(
+                medfilt(signal, kernel_size=kernel_size),
+                median_filter(signal, size=kernel_size, mode='constant')
+            )
+            failed |= not same
+            medfilt_time = best_of(lambda: medfilt(signal, kernel_size=kernel_size), repeat=3)
+            running_time = best_of(lambda: median_filter(signal, size=kernel_size, mode='constant'))
+            print(f"{fs:>4} {label:>7} {kernel_size:>6} {medfilt_time*1000:>8.2f}ms {running_time*1000:>8.2f}ms "
+                  f"{medfilt_time/running_time:>7.1f}x {'OK' if same else 'MISMATCH'}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
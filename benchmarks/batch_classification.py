@@ -0,0 +1,39 @@
+"""
+Throughput (recordings/s) của ECGClassifier.classify_ecg_batch so với vòng
+lặp classify_ecg, theo batch size.
+
+    python -m benchmarks.batch_classification
+"""
+import sys
+
+from app.predictions.libs.ecg_classifier import ECGClassifier
+from benchmarks.synthetic import synthetic_ecg
+from benchmarks.timing import best_of
+
+BATCH_SIZES = [1, 8, 32, 128]
+DURATION = 10
+
+
+def main() -> int:
+    classifier = ECGClassifier()
+    fs = classifier.sampling_rate
+    failed = False
+
+    print(f"{'batch':>6} {'loop rec/s':>11} {'batch rec/s':>12} {'speedup':>8} labels")
+    for batch_size in BATCH_SIZES:
+        signals = [synthetic_ecg(DURATION, fs, heart_rate=60 + i % 60, seed=i) for i in range(batch_size)]
+
+        expected = [classifier.classify_ecg(signal)[0] for signal in signals]
+        labels = [label for label, _ in classifier.classify_ecg_batch(signals)]
+        failed |= labels != expected
+
+        loop_time = best_of(lambda: [classifier.classify_ecg(signal) for signal in signals], repeat=3)
+        batch_time = best_of(lambda: classifier.classify_ecg_batch(signals), repeat=3)
+        print(f"{batch_size:>6} {batch_size/loop_time:>11.1f} {batch_size/batch_time:>12.1f} "
+              f"{loop_time/batch_time:>7.2f}x {'OK' if labels == expected else 'MISMATCH'}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+Peak memory (tracemalloc) và thời gian của extract_beats + analyze_lvh_criteria:
+slice/pad/append từng beat (cách cũ) so với sliding-window view trên buffer
+đã pad, trên tín hiệu 10 phút.
+
+    python -m benchmarks.beat_extraction
+"""
+import sys
+import tracemalloc
+import numpy as np
+
+from app.predictions.libs.ecg_classifier import ECGClassifier
+from benchmarks.synthetic import synthetic_ecg
+from benchmarks.timing import best_of
+
+DURATION = 600
+
+
+class ReferenceBeatExtractor(ECGClassifier):
+    """Trích xuất beat từng peak trước khi dùng sliding-window view"""
+
+    def extract_beats(self, ecg_signal: np.ndarray, qrs_peaks: np.ndarray) -> np.ndarray:
+        beats = []
+        beat_length = int(0.8 * self.sampling_rate)
+
+        for peak in qrs_peaks:
+            start = max(0, peak - beat_length // 3)
+            end = min(len(ecg_signal), peak + 2 * beat_length // 3)
+
+            if end - start >= beat_length // 2:
+                beat = ecg_signal[start:end]
+                if len(beat) > beat_length:
+                    beat = beat[:beat_length]
+                elif len(beat) < beat_length:
+                    beat = np.pad(beat, (0, beat_length - len(beat)), 'constant')
+                beats.append(beat)
+
+        return np.array(beats)
+
+
+def peak_memory(fn) -> int:
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> int:
+    classifier = ECGClassifier()
+    reference = ReferenceBeatExtractor()
+    failed = False
+
+    print(f"{'hr':>4} {'beats':>6} {'old peak':>10} {'new peak':>10} {'old time':>10} {'new time':>10} parity")
+    for heart_rate in (60, 75, 130):
+        processed = classifier.preprocess_ecg(synthetic_ecg(DURATION, classifier.sampling_rate, heart_rate=heart_rate))
+        peaks = classifier.detect_qrs_peaks(processed)
+
+        beats = classifier.extract_beats(processed, peaks)
+        same = np.array_equal(beats, reference.extract_beats(processed, peaks))
+        failed |= not same
+
+        old = lambda: reference.analyze_lvh_criteria(reference.extract_beats(processed, peaks))
+        new = lambda: classifier.analyze_lvh_criteria(classifier.extract_beats(processed, peaks))
+        old_peak, new_peak = peak_memory(old), peak_memory(new)
+        old_time, new_time = best_of(old), best_of(new)
+        print(f"{heart_rate:>4} {len(beats):>6} {old_peak/2**20:>8.2f}MB {new_peak/2**20:>8.2f}MB "
+              f"{old_time*1000:>8.2f}ms {new_time*1000:>8.2f}ms {'OK' if same else 'MISMATCH'}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Throughput của classify_ecg khi nhiều request thread chạy song song (giống
+gunicorn gthread): inline trong thread so với ECGExecutor process pool.
+
+    python -m benchmarks.ecg_executor
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.predictions.libs.ecg_classifier import ECGClassifier
+from app.predictions.libs.ecg_executor import ECGExecutor
+from benchmarks.synthetic import synthetic_ecg
+
+THREADS = 8
+REQUESTS = 64
+DURATION = 4  # ESP32 gửi 1000 mẫu @ 250 Hz
+
+
+def run(executor: ECGExecutor, signals) -> float:
+    with ThreadPoolExecutor(THREADS) as threads:
+        list(threads.map(executor.classify_ecg, signals[:THREADS]))  # warm-up
+        start = time.perf_counter()
+        labels = list(threads.map(executor.classify_ecg, signals))
+        elapsed = time.perf_counter() - start
+    return elapsed, [label for label, _ in labels]
+
+
+def main() -> int:
+    signals = [synthetic_ecg(DURATION, heart_rate=60 + i % 60, seed=i) for i in range(REQUESTS)]
+    expected = [ECGClassifier.shared().classify_ecg(signal)[0] for signal in signals]
+    workers = os.cpu_count() or 1
+    failed = False
+
+    print(f"{THREADS} request threads, {REQUESTS} requests, {workers} pool workers")
+    print(f"{'mode':>8} {'req/s':>8} {'inline':>7} {'pool':>6} labels")
+    for mode in ECGExecutor.EXECUTION_MODES:
+        executor = ECGExecutor(mode=mode, workers=workers, max_pending=2 * workers, timeout=30)
+        elapsed, labels = run(executor, signals)
+        stats = executor.stats()
+        executor.shutdown()
+        failed |= labels != expected
+        print(f"{mode:>8} {REQUESTS/elapsed:>8.1f} {stats['inline']:>7} {stats['submitted']:>6} "
+              f"{'OK' if labels == expected else 'MISMATCH'}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
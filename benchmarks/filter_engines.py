@@ -0,0 +1,43 @@
+"""
+So sánh các filtering engine của ECGClassifier.preprocess_ecg:
+thời gian, sai số so với "direct" và độ khớp nhãn restecg.
+
+    python -m benchmarks.filter_engines
+"""
+import sys
+import numpy as np
+
+from app.predictions.libs.ecg_classifier import ECGClassifier
+from benchmarks.synthetic import synthetic_ecg
+from benchmarks.timing import best_of
+
+DURATIONS = [("2s", 2), ("10s", 10), ("60s", 60), ("10min", 600)]
+ENGINES = ["fft", "sos", "auto"]
+
+
+def main() -> int:
+    failed = False
+    print(f"{'fs':>4} {'signal':>7} {'engine':>7} {'direct':>10} {'engine':>10} {'speedup':>8} {'max rel err':>12} label")
+    for fs in (250, 500):
+        reference = ECGClassifier(sampling_rate=fs, filter_engine="direct")
+        for label, duration in DURATIONS:
+            signal = synthetic_ecg(duration, fs)
+            expected = reference.preprocess_ecg(signal)
+            expected_label, _ = reference.classify_ecg(signal)
+            direct_time = best_of(lambda: reference.preprocess_ecg(signal))
+
+            for engine in ENGINES:
+                classifier = ECGClassifier(sampling_rate=fs, filter_engine=engine)
+                output = classifier.preprocess_ecg(signal)
+                error = np.nanmax(np.abs(output - expected)) / np.nanmax(np.abs(expected))
+                same_label = classifier.classify_ecg(signal)[0] == expected_label
+                failed |= not same_label
+                engine_time = best_of(lambda: classifier.preprocess_ecg(signal))
+                print(f"{fs:>4} {label:>7} {engine:>7} {direct_time*1000:>8.2f}ms {engine_time*1000:>8.2f}ms "
+                      f"{direct_time/engine_time:>7.1f}x {error:>12.1e} {'OK' if same_label else 'MISMATCH'}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
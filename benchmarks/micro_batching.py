@@ -0,0 +1,91 @@
+"""
+Throughput và latency (p50/p99) của HeartDiseaseModel.predict khi nhiều
+request thread gọi đồng thời: gọi trực tiếp so với MicroBatcher theo window.
+
+    python -m benchmarks.micro_batching            # model giả lập overhead cố định
+    python -m benchmarks.micro_batching --model    # HeartDiseaseModel thật (cần MODEL_PATH/SCALER_PATH)
+"""
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.predictions.libs.micro_batcher import MicroBatcher
+
+THREADS = 32
+REQUESTS = 2000
+WINDOWS_MS = [1, 2, 5, 10]
+SAMPLE = [52, 1, 2, 130, 0, 150, 0]
+
+
+class SimulatedModel:
+    """Forward pass có overhead cố định mỗi lần gọi (giống Keras predict) và chạy tuần tự"""
+
+    def __init__(self, call_overhead_ms: float, per_row_us: float):
+        self.call_overhead = call_overhead_ms / 1000
+        self.per_row = per_row_us / 1e6
+        self._lock = threading.Lock()
+
+    def predict_batch(self, features_batch):
+        with self._lock:
+            time.sleep(self.call_overhead + self.per_row * len(features_batch))
+        return [(sum(features) / 1000, "NEGATIVE") for features in features_batch]
+
+
+def run(predict, features):
+    latencies = []
+
+    def call(x):
+        start = time.perf_counter()
+        result = predict(x)
+        latencies.append(time.perf_counter() - start)
+        return result
+
+    with ThreadPoolExecutor(THREADS) as threads:
+        start = time.perf_counter()
+        results = list(threads.map(call, features))
+        elapsed = time.perf_counter() - start
+    return results, len(features) / elapsed, np.percentile(latencies, [50, 99]) * 1000
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", action="store_true", help="dùng HeartDiseaseModel thật")
+    parser.add_argument("--call-overhead-ms", type=float, default=3.0)
+    parser.add_argument("--per-row-us", type=float, default=20.0)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    args = parser.parse_args(argv)
+
+    if args.model:
+        from app.predictions.libs.heart_disease_model import HeartDiseaseModel
+        model = HeartDiseaseModel()
+        model.load()
+        predict_batch = model.predict_batch
+    else:
+        predict_batch = SimulatedModel(args.call_overhead_ms, args.per_row_us).predict_batch
+
+    rng = np.random.default_rng(0)
+    features = [[int(v) for v in np.array(SAMPLE) + rng.integers(-5, 5, len(SAMPLE)) * [1, 0, 0, 1, 0, 1, 0]]
+                for _ in range(REQUESTS)]
+    expected, rps, (p50, p99) = run(lambda x: predict_batch([x])[0], features)
+    failed = False
+
+    print(f"{THREADS} threads, {REQUESTS} requests")
+    print(f"{'mode':>12} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'avg batch':>10} results")
+    print(f"{'direct':>12} {rps:>9.1f} {p50:>8.2f} {p99:>8.2f} {1:>10.1f} OK")
+    for window_ms in WINDOWS_MS:
+        batcher = MicroBatcher(predict_batch, window=window_ms / 1000, max_batch_size=args.max_batch_size)
+        results, rps, (p50, p99) = run(batcher, features)
+        same = np.allclose([r[0] for r in results], [e[0] for e in expected], rtol=0, atol=1e-6)
+        failed |= not same
+        print(f"{f'window {window_ms}ms':>12} {rps:>9.1f} {p50:>8.2f} {p99:>8.2f} "
+              f"{batcher.stats()['avg_batch_size']:>10.1f} {'OK' if same else 'MISMATCH'}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Benchmark đường serving của model cho từng inference backend (keras / tflite /
+numpy): thời gian load, latency lần gọi đầu, latency 1 request ở trạng thái
+ổn định qua HeartDiseaseModel.predict và throughput của predict_batch theo
+batch size 1..256. Ghi kết quả ra file JSON để so sánh giữa các commit.
+
+    python -m benchmarks.model_inference                       # mọi backend có artifact
+    python -m benchmarks.model_inference --backends numpy tflite
+    python -m benchmarks.model_inference --output benchmarks/results/model_<commit>.json
+
+Mỗi backend chạy trong 1 process riêng (load time là cold start thật, gồm cả
+import TensorFlow/tflite_runtime). Backend thiếu artifact hoặc thư viện được
+ghi "available": false thay vì làm hỏng cả lần chạy. Cache kết quả và
+micro-batching bị tắt để đo đúng chi phí inference.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, "model_inference.json")
+BACKENDS = ["keras", "tflite", "numpy"]
+BATCH_SIZES = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+SAMPLE = [52, 1, 2, 130, 0, 150, 0]
+
+# HeartDiseaseModel không cache / gom batch / theo dõi CURRENT trong lúc đo
+BENCH_ENV = {
+    "MODEL_CACHE_SIZE": "0",
+    "MODEL_BATCH_WINDOW_MS": "0",
+    "MODEL_VERSION_CHECK_INTERVAL": "0",
+    "METRICS_ENABLED": "false",
+}
+
+
+def write_json(path: str, data: Dict) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__)).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def random_features(n: int, seed: int = 0) -> List[List[int]]:
+    """Feature vector hợp lệ quanh SAMPLE (age, trestbps, thalach thay đổi)"""
+    rng = np.random.default_rng(seed)
+    deltas = rng.integers(-10, 10, (n, len(SAMPLE))) * np.array([1, 0, 0, 1, 0, 1, 0])
+    return (np.array(SAMPLE) + deltas).tolist()
+
+
+def percentiles_ms(latencies: List[float]) -> Dict:
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000
+    return {"mean": float(np.mean(latencies) * 1000), "p50": float(p50), "p90": float(p90), "p99": float(p99)}
+
+
+def bench_backend(requests: int, min_time: float) -> Dict:
+    """Chạy trong process con, MODEL_BACKEND đã được đặt qua biến môi trường"""
+    from app.config import Config
+
+    start = time.perf_counter()
+    from app.predictions.libs.heart_disease_model import HeartDiseaseModel
+    model = HeartDiseaseModel()
+    import_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model.load()
+    load_time = time.perf_counter() - start
+
+    features = random_features(requests + 1)
+    start = time.perf_counter()
+    model.predict(features[0])
+    first_call = time.perf_counter() - start
+
+    latencies = []
+    for x in features[1:]:
+        start = time.perf_counter()
+        model.predict(x)
+        latencies.append(time.perf_counter() - start)
+
+    batches = {}
+    for batch_size in BATCH_SIZES:
+        batch = random_features(batch_size, seed=batch_size)
+        model.predict_batch(batch)
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            model.predict_batch(batch)
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time and calls >= 3:
+                break
+        batches[str(batch_size)] = {
+            "calls": calls,
+            "ms_per_batch": elapsed / calls * 1000,
+            "rows_per_second": batch_size * calls / elapsed,
+        }
+
+    return {
+        "available": True,
+        "backend": Config.MODEL_BACKEND,
+        "model_version": model.model_version,
+        "import_time_ms": import_time * 1000,
+        "load_time_ms": load_time * 1000,
+        "first_call_ms": first_call * 1000,
+        "single_request_ms": percentiles_ms(latencies),
+        "batch_throughput": batches,
+    }
+
+
+def run_backend(name: str, requests: int, min_time: float) -> Dict:
+    env = dict(os.environ, MODEL_BACKEND=name, **BENCH_ENV)
+    command = [sys.executable, "-m", "benchmarks.model_inference", "--worker",
+               "--requests", str(requests), "--min-time", str(min_time)]
+    completed = subprocess.run(command, env=env, capture_output=True, text=True)
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        error = (completed.stderr.strip().splitlines() or ["unknown error"])[-1]
+        return {"available": False, "backend": name, "error": error}
+    return json.loads(lines[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="*", default=BACKENDS, choices=BACKENDS)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="file JSON kết quả")
+    parser.add_argument("--requests", type=int, default=500, help="số request tuần tự để đo latency ổn định")
+    parser.add_argument("--min-time", type=float, default=0.5, help="thời gian đo tối thiểu mỗi batch size (s)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        try:
+            result = bench_backend(args.requests, args.min_time)
+        except Exception as e:
+            print(f"{type(e).__name__}: {e}", file=sys.stderr)
+            return 1
+        print(json.dumps(result))
+        return 0
+
+    results = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "backends": {},
+    }
+
+    for name in args.backends:
+        result = run_backend(name, args.requests, args.min_time)
+        results["backends"][name] = result
+        if not result["available"]:
+            print(f"{name}: unavailable ({result['error']})")
+            continue
+        single = result["single_request_ms"]
+        print(f"{name} ({result['model_version']}): load {result['load_time_ms']:.1f} ms, "
+              f"first call {result['first_call_ms']:.2f} ms, "
+              f"single request p50 {single['p50']:.3f} ms / p99 {single['p99']:.3f} ms")
+        print(f"  {'batch':>6} {'ms/batch':>10} {'rows/s':>12}")
+        for batch_size, row in result["batch_throughput"].items():
+            print(f"  {batch_size:>6} {row['ms_per_batch']:>10.3f} {row['rows_per_second']:>12.0f}")
+
+    write_json(args.output, results)
+    print(f"\nResults: {args.output}")
+    return 0 if any(result["available"] for result in results["backends"].values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+Benchmark từng stage của ECGClassifier (preprocess / detect_qrs_peaks /
+extract_beats / ST / LVH và classify_ecg) trên tín hiệu giả lập, ghi kết quả
+ra file JSON và so sánh với baseline để bắt regression.
+
+    python -m benchmarks.pipeline                                  # chạy + ghi JSON
+    python -m benchmarks.pipeline --save-baseline                  # lưu baseline
+    python -m benchmarks.pipeline --baseline benchmarks/results/pipeline_baseline.json
+
+Baseline phụ thuộc máy: lưu và so sánh trên cùng máy (hoặc cùng loại runner CI).
+Một stage bị coi là chậm đi nếu thời gian > baseline * --max-ratio và chênh
+lệch lớn hơn --min-delta-ms (tránh báo nhầm với stage chỉ vài chục µs).
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+import scipy
+
+from app.predictions.libs.ecg_classifier import ECGClassifier
+from benchmarks.synthetic import synthetic_ecg
+from benchmarks.timing import best_of
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, "pipeline.json")
+DEFAULT_BASELINE = os.path.join(RESULTS_DIR, "pipeline_baseline.json")
+
+STAGES = ["preprocess", "detect_qrs_peaks", "extract_beats", "st_analysis", "lvh_analysis", "classify_ecg"]
+
+# (tên, tham số synthetic_ecg)
+CASES = [
+    ("esp32_4s", dict(duration=4, sampling_rate=250, heart_rate=75)),
+    ("1min_normal", dict(duration=60, sampling_rate=250, heart_rate=75)),
+    ("1min_tachy_noisy", dict(duration=60, sampling_rate=250, heart_rate=130, noise=60.0, baseline_wander=300.0)),
+    ("1min_st_depression", dict(duration=60, sampling_rate=250, heart_rate=75, st_deviation=-150.0)),
+    ("1min_360hz", dict(duration=60, sampling_rate=360, heart_rate=75)),
+    ("1min_500hz", dict(duration=60, sampling_rate=500, heart_rate=75)),
+    ("10min_normal", dict(duration=600, sampling_rate=250, heart_rate=75)),
+]
+
+
+def run_case(params: Dict, repeat: int) -> Dict:
+    signal = synthetic_ecg(**params)
+    classifier = ECGClassifier.shared(sampling_rate=params["sampling_rate"])
+
+    processed = classifier.preprocess_ecg(signal)
+    peaks = classifier.detect_qrs_peaks(processed)
+    beats = classifier.extract_beats(processed, peaks)
+    heart_rate = len(peaks) * 60 / (len(processed) / classifier.sampling_rate)
+    label, details = classifier.classify_ecg(signal)
+
+    timings = {
+        "preprocess": best_of(lambda: classifier.preprocess_ecg(signal), repeat),
+        "detect_qrs_peaks": best_of(lambda: classifier.detect_qrs_peaks(processed), repeat),
+        "extract_beats": best_of(lambda: classifier.extract_beats(processed, peaks), repeat),
+        "st_analysis": best_of(lambda: classifier.analyze_st_segments(beats, heart_rate), repeat),
+        "lvh_analysis": best_of(lambda: classifier.analyze_lvh_criteria(beats), repeat),
+        "classify_ecg": best_of(lambda: classifier.classify_ecg(signal), repeat),
+    }
+
+    return {
+        "params": params,
+        "samples": len(signal),
+        "qrs_peaks": len(peaks),
+        "num_beats": len(beats),
+        "label": label,
+        "st_abnormal_ratio": details.get("st_abnormal_ratio"),
+        "timings_ms": {stage: seconds * 1000 for stage, seconds in timings.items()},
+    }
+
+
+def compare(results: Dict, baseline: Dict, max_ratio: float, min_delta_ms: float) -> List[str]:
+    """Danh sách regression (case/stage chậm hơn ngưỡng so với baseline)"""
+    regressions = []
+    for name, case in results["cases"].items():
+        base_case = baseline["cases"].get(name)
+        if base_case is None:
+            continue
+        for stage, ms in case["timings_ms"].items():
+            base_ms = base_case["timings_ms"].get(stage)
+            if base_ms is None:
+                continue
+            if ms > base_ms * max_ratio and ms - base_ms > min_delta_ms:
+                regressions.append(f"{name}/{stage}: {base_ms:.3f}ms -> {ms:.3f}ms ({ms/base_ms:.2f}x)")
+        if case["label"] != base_case["label"]:
+            regressions.append(f"{name}: label {base_case['label']} -> {case['label']}")
+    return regressions
+
+
+def write_json(path: str, data: Dict) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="file JSON kết quả")
+    parser.add_argument("--baseline", help="file JSON baseline để kiểm tra regression")
+    parser.add_argument("--save-baseline", action="store_true", help=f"ghi kết quả làm baseline ({DEFAULT_BASELINE})")
+    parser.add_argument("--max-ratio", type=float, default=1.25, help="ngưỡng chậm đi tối đa so với baseline")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="bỏ qua chênh lệch nhỏ hơn (ms)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--cases", nargs="*", help="chỉ chạy các case này")
+    args = parser.parse_args(argv)
+
+    results = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "scipy": scipy.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "cases": {},
+    }
+
+    print(f"{'case':<20} {'beats':>6} " + " ".join(f"{stage[:12]:>12}" for stage in STAGES) + "  (ms)")
+    for name, params in CASES:
+        if args.cases and name not in args.cases:
+            continue
+        case = run_case(params, args.repeat)
+        results["cases"][name] = case
+        print(f"{name:<20} {case['num_beats']:>6} " + " ".join(f"{case['timings_ms'][stage]:>12.3f}" for stage in STAGES))
+
+    write_json(args.output, results)
+    print(f"\nResults: {args.output}")
+    if args.save_baseline:
+        write_json(DEFAULT_BASELINE, results)
+        print(f"Baseline: {DEFAULT_BASELINE}")
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.max_ratio, args.min_delta_ms)
+    if regressions:
+        print(f"\nRegressions (> {args.max_ratio}x baseline):")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+
+    print(f"\nNo regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Benchmark + parity check cho Pan-Tompkins adaptive threshold trong
+ECGClassifier.detect_qrs_peaks.
+
+    python -m benchmarks.qrs_detector
+
+Parity check riêng (assert, gồm các case biên, không đo thời gian):
+python -m benchmarks.qrs_parity
+"""
+import sys
+import numpy as np
+
+from app.predictions.libs.ecg_classifier import (
+    ECGClassifier, _pan_tompkins_kernel, _pan_tompkins_kernel_jit
+)
+from benchmarks.synthetic import synthetic_ecg
+from benchmarks.timing import best_of
+
+DURATIONS = [("10s", 10), ("60s", 60), ("10min", 600)]
+
+
+def reference_threshold(ma: np.ndarray, warmup_samples: int) -> np.ndarray:
+    """Vòng lặp gốc (numpy scalar) trước khi tối ưu"""
+    SPKI, NPKI = 0.0, 0.0
+    threshold_I1 = 0.0
+    peaks = []
+
+    for i, val in enumerate(ma):
+        if val > threshold_I1 and i > warmup_samples:
+            peaks.append(i)
+            SPKI = 0.125*val + 0.875*SPKI
+        else:
+            NPKI = 0.125*val + 0.875*NPKI
+        threshold_I1 = NPKI + 0.25*(SPKI - NPKI)
+
+    return np.array(peaks)
+
+
+def moving_average_energy(classifier: ECGClassifier, signal: np.ndarray) -> np.ndarray:
+    """Bước 1-3 của detect_qrs_peaks (derivative, square, moving average)"""
+    sig = signal.copy()
+    sig[np.isnan(sig)] = 0
+    diff2 = np.diff(sig, prepend=sig[0])**2
+    return classifier._moving_average_filter(diff2, max(1, int(0.15*classifier.sampling_rate)))
+
+
+def main() -> int:
+    classifier = ECGClassifier()
+    fs = classifier.sampling_rate
+    warmup = int(0.25*fs)
+    engines = [("python-float", lambda ma: np.flatnonzero(_pan_tompkins_kernel(ma.tolist(), warmup, np.zeros(3), 0)))]
+    if _pan_tompkins_kernel_jit is not None:
+        _pan_tompkins_kernel_jit(np.zeros(fs), warmup, np.zeros(3), 0)  # JIT compile trước khi đo
+        engines.append(("numba", lambda ma: np.flatnonzero(_pan_tompkins_kernel_jit(ma, warmup, np.zeros(3), 0))))
+
+    failed = False
+    print(f"{'signal':>8} {'engine':>14} {'reference':>12} {'engine':>12} {'speedup':>9} parity")
+    for label, duration in DURATIONS:
+        ma = moving_average_energy(classifier, classifier.preprocess_ecg(synthetic_ecg(duration, fs)))
+        expected = reference_threshold(ma, warmup)
+        ref_time = best_of(lambda: reference_threshold(ma, warmup), repeat=3)
+
+        for name, engine in engines:
+            same = np.array_equal(engine(ma), expected)
+            failed |= not same
+            engine_time = best_of(lambda: engine(ma))
+            print(f"{label:>8} {name:>14} {ref_time*1000:>10.2f}ms {engine_time*1000:>10.2f}ms "
+                  f"{ref_time/engine_time:>8.1f}x {'OK' if same else 'MISMATCH'}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
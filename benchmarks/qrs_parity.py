@@ -0,0 +1,80 @@
+"""
+Parity check (không đo thời gian) cho Pan-Tompkins adaptive threshold:
+vòng lặp gốc (benchmarks.qrs_detector.reference_threshold) so với
+_pan_tompkins_kernel (Python float), bản numba nếu có và
+ECGClassifier._adaptive_threshold mà detect_qrs_peaks dùng.
+
+    python -m benchmarks.qrs_parity
+
+Gồm tín hiệu giả lập 10 s / 60 s / 10 phút, tín hiệu phẳng, tín hiệu rất
+ngắn (1 s, vừa qua warm-up, 1 mẫu, rỗng) và chạy kernel theo chunk có state.
+Lệch ở bất kỳ case nào -> AssertionError, exit code khác 0.
+"""
+import sys
+from typing import Callable, Dict
+
+import numpy as np
+
+from app.predictions.libs.ecg_classifier import ECGClassifier, _pan_tompkins_kernel, _pan_tompkins_kernel_jit
+from benchmarks.qrs_detector import DURATIONS, moving_average_energy, reference_threshold
+from benchmarks.synthetic import synthetic_ecg
+
+
+def engines(classifier: ECGClassifier, warmup: int) -> Dict[str, Callable[[np.ndarray], np.ndarray]]:
+    result = {
+        "python-float": lambda ma: np.flatnonzero(_pan_tompkins_kernel(ma.tolist(), warmup, np.zeros(3), 0)),
+        "classifier": lambda ma: classifier._adaptive_threshold(ma, warmup),
+    }
+    if _pan_tompkins_kernel_jit is not None:
+        result["numba"] = lambda ma: np.flatnonzero(
+            _pan_tompkins_kernel_jit(np.ascontiguousarray(ma, dtype=np.float64), warmup, np.zeros(3), 0)
+        )
+    return result
+
+
+def cases(classifier: ECGClassifier) -> Dict[str, np.ndarray]:
+    fs = classifier.sampling_rate
+    result = {
+        label: moving_average_energy(classifier, classifier.preprocess_ecg(synthetic_ecg(duration, fs)))
+        for label, duration in DURATIONS
+    }
+    result["flat"] = moving_average_energy(classifier, classifier.preprocess_ecg(np.full(10 * fs, 2048.0)))
+    # Tín hiệu ngắn nhất preprocess_ecg nhận (1 s)
+    result["short (1s)"] = moving_average_energy(classifier, classifier.preprocess_ecg(synthetic_ecg(1, fs)))
+    result["short (warm-up + 1)"] = result["10s"][:int(0.25 * fs) + 2]
+    result["single sample"] = np.array([1.0])
+    result["empty"] = np.zeros(0)
+    return result
+
+
+def check_chunked(ma: np.ndarray, warmup: int, expected: np.ndarray, chunk_size: int) -> None:
+    """Kernel chạy từng chunk với state/offset (như streaming) cho cùng peak"""
+    state = np.zeros(3)
+    peaks = []
+    for start in range(0, len(ma), chunk_size):
+        chunk = ma[start:start + chunk_size]
+        peaks.extend((start + np.flatnonzero(_pan_tompkins_kernel(chunk.tolist(), warmup, state, start))).tolist())
+    assert np.array_equal(np.array(peaks, dtype=int), expected), f"chunked ({chunk_size}) kernel differs"
+
+
+def main() -> int:
+    classifier = ECGClassifier()
+    warmup = int(0.25 * classifier.sampling_rate)
+    checks = engines(classifier, warmup)
+
+    for label, ma in cases(classifier).items():
+        expected = reference_threshold(ma, warmup).astype(int)
+        for name, engine in checks.items():
+            actual = engine(ma)
+            assert np.array_equal(actual, expected), (
+                f"{label}: {name} found {len(actual)} peaks, reference {len(expected)}"
+            )
+        if len(ma) > 1:
+            check_chunked(ma, warmup, expected, chunk_size=max(1, len(ma) // 7))
+        print(f"{label:>20}: {len(ma):>7} samples, {len(expected):>6} peaks OK ({', '.join(checks)}, chunked)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
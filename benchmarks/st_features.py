@@ -0,0 +1,161 @@
+"""
+Benchmark phân tích ST/J-point: vòng lặp analyze_st_segment từng beat (cách
+cũ) so với ECGClassifier.analyze_st_segments trên cả ma trận beats.
+
+    python -m benchmarks.st_features
+"""
+import sys
+import numpy as np
+from typing import Tuple
+
+from app.predictions.libs.ecg_classifier import ECGClassifier
+from benchmarks.synthetic import synthetic_ecg
+from benchmarks.timing import best_of
+
+DURATIONS = [("10s", 10), ("60s", 60), ("10min", 600)]
+
+
+class ReferenceSTAnalyzer(ECGClassifier):
+    """Phân tích ST từng beat (polyfit mỗi beat) trước khi vectorize"""
+
+    def _calculate_st_slope(self, beat: np.ndarray, j_idx: int) -> Tuple[float, str]:
+        """
+        Tính toán ST slope để giảm false alarm trong tachycardia
+        """
+        fs = self.sampling_rate
+        
+        # ST segment: J point đến J+80ms
+        st_start = j_idx
+        st_end = min(j_idx + int(0.08*fs), len(beat))
+        
+        if st_end <= st_start + 1:
+            return 0.0, "insufficient_data"
+        
+        st_segment = beat[st_start:st_end]
+        time_points = np.arange(len(st_segment)) / fs
+        
+        # Linear regression for slope
+        if len(time_points) > 1:
+            slope = np.polyfit(time_points, st_segment, 1)[0]
+            
+            # Classify slope
+            if slope > 0.5:
+                slope_type = "upslope"
+            elif slope < -0.5:
+                slope_type = "downslope"
+            else:
+                slope_type = "flat"
+                
+            return slope, slope_type
+        
+        return 0.0, "insufficient_data"
+
+    def analyze_st_segment(self, beat: np.ndarray, heart_rate: float = 60) -> Tuple[bool, float, str]:
+        """
+        Phân tích ST segment với ST-slope analysis để giảm false alarm
+        """
+        fs = self.sampling_rate
+        
+        # Validation
+        if np.any(np.isnan(beat)) or len(beat) < 0.6*fs:
+            return False, 0.0, "artifact"
+
+        # Tìm R peak
+        r_idx = np.argmax(beat)
+        
+        # 1. Tìm J point
+        search_window = int(0.12*fs)
+        end_idx = min(r_idx + search_window, len(beat))
+        window = beat[r_idx:end_idx]
+        
+        if len(window) < 2:
+            return False, 0.0, "short_beat"
+        
+        # Gradient để tìm J point
+        der = np.gradient(window)
+        j_candidates = np.where(np.abs(der) < 0.05)[0]
+        
+        if len(j_candidates) == 0:
+            return False, 0.0, "no_J"
+        
+        j_offset = j_candidates[0]
+        j_idx = r_idx + j_offset
+        
+        # 2. ST measurement point (J + 60ms)
+        st_idx = j_idx + int(0.06*fs)
+        
+        if st_idx >= len(beat):
+            return False, 0.0, "short_beat"
+
+        # 3. Baseline estimation
+        baseline_window = int(0.2*fs)
+        base_start = max(0, j_idx - baseline_window)
+        baseline_segment = beat[base_start:j_idx]
+        
+        if len(baseline_segment) == 0:
+            baseline = 0.0
+        else:
+            baseline = np.median(baseline_segment)
+
+        # 4. ST amplitude calculation
+        st_amp = beat[st_idx] - baseline
+
+        # 5. ST slope analysis
+        slope, slope_type = self._calculate_st_slope(beat, j_idx)
+
+        # 6. Advanced abnormality detection
+        # Adaptive threshold based on heart rate and slope
+        base_threshold = self.st_threshold
+        
+        # Tachycardia adjustment (giảm false alarm trong nhịp nhanh)
+        if heart_rate > 100:
+            # Trong tachycardia, cần threshold cao hơn
+            base_threshold *= 1.3
+            
+            # Nếu là upslope trong tachycardia, có thể là normal
+            if slope_type == "upslope" and abs(st_amp) < base_threshold * 1.5:
+                return False, st_amp, f"tachycardia_upslope_{slope:.3f}"
+        
+        # Primary abnormality detection
+        abnormal = abs(st_amp) >= base_threshold
+        
+        # Secondary criteria: slope analysis
+        if slope_type == "downslope" and st_amp < -base_threshold * 0.7:
+            abnormal = True
+        elif slope_type == "upslope" and st_amp > base_threshold * 0.7:
+            abnormal = True
+        
+        status = f"st_amp_{st_amp:.3f}_{slope_type}_slope_{slope:.3f}"
+        
+        return abnormal, st_amp, status
+
+
+def main() -> int:
+    classifier = ECGClassifier()
+    reference = ReferenceSTAnalyzer()
+    failed = False
+
+    print(f"{'signal':>7} {'beats':>6} {'loop':>10} {'matrix':>10} {'speedup':>8} parity")
+    for label, duration in DURATIONS:
+        for heart_rate in (75, 130):
+            processed = classifier.preprocess_ecg(synthetic_ecg(duration, classifier.sampling_rate, heart_rate=heart_rate))
+            beats = classifier.extract_beats(processed, classifier.detect_qrs_peaks(processed))
+
+            expected = [reference.analyze_st_segment(beat, heart_rate) for beat in beats]
+            abnormal, st_amp, _ = classifier.analyze_st_segments(beats, heart_rate)
+            same = (
+                np.array_equal(abnormal, [e[0] for e in expected])
+                and np.allclose(st_amp, [e[1] for e in expected], rtol=0, atol=1e-12)
+            )
+            failed |= not same
+
+            loop_time = best_of(lambda: [reference.analyze_st_segment(beat, heart_rate) for beat in beats], repeat=3)
+            matrix_time = best_of(lambda: classifier.analyze_st_segments(beats, heart_rate))
+            print(f"{label:>7} {len(beats):>6} {loop_time*1000:>8.2f}ms {matrix_time*1000:>8.2f}ms "
+                  f"{loop_time/matrix_time:>7.1f}x {'OK' if same else 'MISMATCH'}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Độ trễ mỗi chunk của StreamingECGClassifier.update theo kích thước chunk,
+kiểm tra beat không phụ thuộc cách chia chunk, nhãn finalize() (tính lại
+trên buffer raw) khớp classify_ecg trên toàn bộ tín hiệu và bản ghi bị cắt
+không được gán nhãn âm thầm.
+
+    python -m benchmarks.streaming
+"""
+import sys
+import time
+
+from app.predictions.libs.ecg_classifier import ECGClassifier
+from app.predictions.libs.streaming_ecg_classifier import StreamingECGClassifier
+from benchmarks.synthetic import synthetic_ecg
+
+CHUNK_SIZES = [1000, 250, 50, 10]
+DURATION = 60
+
+
+def stream(signal, chunk_size):
+    streaming = StreamingECGClassifier()
+    indices = []
+    latencies = []
+    for start in range(0, len(signal), chunk_size):
+        t0 = time.perf_counter()
+        result = streaming.update(signal[start:start + chunk_size])
+        latencies.append(time.perf_counter() - t0)
+        indices += [beat["index"] for beat in result["beats"]]
+    label, _ = streaming.finalize()
+    return indices, latencies, label
+
+
+def main() -> int:
+    classifier = ECGClassifier.shared()
+    signal = synthetic_ecg(DURATION, classifier.sampling_rate, heart_rate=75)
+    expected_label, details = classifier.classify_ecg(signal)
+    reference = None
+    failed = False
+
+    print(f"batch: {details.get('num_beats')} beats, label {expected_label}")
+    print(f"{'chunk':>6} {'beats':>6} {'mean ms':>8} {'max ms':>8} {'samples/s':>11} result")
+    for chunk_size in CHUNK_SIZES:
+        indices, latencies, label = stream(signal, chunk_size)
+        reference = reference if reference is not None else indices
+        ok = indices == reference and label == expected_label
+        failed |= not ok
+        print(f"{chunk_size:>6} {len(indices):>6} {1e3*sum(latencies)/len(latencies):>8.3f} "
+              f"{1e3*max(latencies):>8.3f} {len(signal)/sum(latencies):>11.0f} {'OK' if ok else 'MISMATCH'}")
+
+    # Buffer raw bị giới hạn: finalize() báo lỗi, trừ khi chấp nhận nhãn trên max_seconds giây cuối
+    window = DURATION // 2
+    capped = StreamingECGClassifier(max_seconds=window)
+    for start in range(0, len(signal), 250):
+        capped.update(signal[start:start + 250])
+    try:
+        capped.finalize()
+        raised = False
+    except ValueError:
+        raised = True
+    label, capped_details = capped.finalize(allow_truncated=True)
+    tail_label, _ = classifier.classify_ecg(signal[-window * classifier.sampling_rate:])
+    ok = (raised and capped_details["truncated"] and label == tail_label
+          and capped_details["recomputed"]["samples"] == window * classifier.sampling_rate)
+    failed |= not ok
+    print(f"max_seconds={window}: recomputed on {capped_details['recomputed']}, label {label} "
+          f"{'OK' if ok else 'MISMATCH'}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
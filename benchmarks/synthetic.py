@@ -0,0 +1,37 @@
+import numpy as np
+
+
+def synthetic_ecg(duration: float, sampling_rate: int = 250, heart_rate: float = 75,
+                  noise: float = 20.0, seed: int = 0, baseline_wander: float = 100.0,
+                  wander_frequency: float = 0.3, st_deviation: float = 0.0) -> np.ndarray:
+    """
+    Tín hiệu ECG giả lập (đơn vị ADC) gồm chuỗi QRS + sóng T dạng Gaussian
+
+    Args:
+        duration: độ dài (giây)
+        sampling_rate: tần số lấy mẫu (Hz)
+        heart_rate: nhịp tim (bpm)
+        noise: độ lệch chuẩn nhiễu Gaussian (ADC)
+        seed: seed cho nhiễu
+        baseline_wander: biên độ baseline wander hình sin (ADC)
+        wander_frequency: tần số baseline wander (Hz)
+        st_deviation: độ chênh ST (ADC) từ J point (+40 ms) tới trước sóng T,
+            dương = ST chênh lên, âm = ST chênh xuống
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration * sampling_rate)) / sampling_rate
+    signal = np.zeros_like(t)
+
+    rr = 60.0 / heart_rate
+    for beat_time in np.arange(0.5, duration, rr):
+        signal += 1000 * np.exp(-((t - beat_time) / 0.012) ** 2)
+        signal += 150 * np.exp(-((t - beat_time - 0.3) / 0.05) ** 2)
+        if st_deviation:
+            # Plateau ST với 2 cạnh mềm (logistic ~5 ms)
+            rise = 1 / (1 + np.exp(-(t - beat_time - 0.04) / 0.005))
+            fall = 1 / (1 + np.exp(-(t - beat_time - 0.24) / 0.01))
+            signal += st_deviation * (rise - fall)
+
+    signal += rng.normal(0, noise, len(t))
+    signal += baseline_wander * np.sin(2 * np.pi * wander_frequency * t)
+    return signal + 2048
@@ -0,0 +1,11 @@
+from timeit import default_timer as timer
+
+
+def best_of(fn, repeat: int = 5) -> float:
+    """Thời gian (giây) nhỏ nhất của fn() qua `repeat` lần chạy"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = timer()
+        fn()
+        best = min(best, timer() - start)
+    return best
@@ -0,0 +1,20 @@
+import glob
+import os
+
+# gunicorn tự đọc file này khi chạy từ thư mục gốc repo: `gunicorn wsgi:app`
+# Metrics multiprocess cần PROMETHEUS_MULTIPROC_DIR (vd. /tmp/heartify-metrics)
+
+
+def on_starting(server):
+    # Xóa file metric của lần chạy trước
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, '*.db')):
+            os.remove(path)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,9 +1,76 @@
+import logging
+import os
+import subprocess
+import sys
+
+import click
 from flask import Flask
 from flask.cli import FlaskGroup
-from app import create_app
+from app import create_app, create_tables
 
 app = create_app()
-cli = FlaskGroup(app)
+cli = FlaskGroup(create_app=lambda: app)
+
+
+@cli.command("create-db")
+def create_db():
+    """Tạo các bảng còn thiếu trong database, thêm cột / index mới vào bảng đã có"""
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    create_tables()
+    click.echo("Database tables created")
+
+
+@cli.command("startup-report")
+@click.option("--runs", default=3, help="Số lần khởi động process mới cho mỗi chế độ")
+def startup_report(runs):
+    """Đo thời gian khởi động app (process mới) với FAST_BOOT bật/tắt"""
+    script = (
+        "import time; start = time.perf_counter(); "
+        "from app import create_app; app = create_app(); "
+        "report = app.config['STARTUP_REPORT']; "
+        "print(time.perf_counter() - start, report['import_time'], report['create_app_time'], "
+        "','.join(report['heavy_modules_loaded']) or '-')"
+    )
+    click.echo(f"{'fast_boot':>9} {'total ms':>9} {'import ms':>10} {'create_app ms':>14} heavy modules")
+    for fast_boot in ("false", "true"):
+        env = dict(os.environ, FAST_BOOT=fast_boot, STARTUP_REPORT="false")
+        for _ in range(runs):
+            output = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True)
+            total, import_time, create_time, modules = output.stdout.split()
+            click.echo(f"{fast_boot:>9} {float(total)*1000:>9.0f} {float(import_time)*1000:>10.0f} "
+                       f"{float(create_time)*1000:>14.0f} {modules}")
+
+
+@cli.command("rescore-predictions")
+@click.option("--workers", default=1, help="Số process chạy song song (chia theo đoạn id)")
+@click.option("--chunk-size", default=2000, help="Số dòng mỗi lần đọc/predict/bulk update")
+@click.option("--start-id", type=int, default=None)
+@click.option("--end-id", type=int, default=None)
+@click.option("--checkpoint-dir", default=".rescore", help="Thư mục checkpoint để chạy tiếp sau khi bị ngắt (chỉ khi cùng tham số, khoảng id và model)")
+@click.option("--reset", is_flag=True, help="Bỏ checkpoint cũ, chấm lại từ đầu")
+@click.option("--dry-run", is_flag=True, help="Chỉ chấm điểm, không ghi database")
+def rescore_predictions_command(workers, chunk_size, start_id, end_id, checkpoint_dir, reset, dry_run):
+    """Chấm lại probability/prediction của các dòng predictions bằng model hiện tại"""
+    from app.predictions.rescoring import rescore_predictions
+
+    if reset and os.path.isdir(checkpoint_dir):
+        for name in os.listdir(checkpoint_dir):
+            if name.startswith("rescore_"):
+                os.remove(os.path.join(checkpoint_dir, name))
+
+    def progress(result):
+        click.echo(f"  ids {result['start_id']}-{result['end_id']}: {result['rows']} rows "
+                   f"(resumed from {result['resumed_from']}) in {result['seconds']:.1f}s, "
+                   f"{result['rows_per_second']:.0f} rows/s, model {result['model_version']}")
+
+    try:
+        summary = rescore_predictions(workers=workers, chunk_size=chunk_size, start_id=start_id, end_id=end_id,
+                                      checkpoint_dir=checkpoint_dir, dry_run=dry_run, progress=progress)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Rescored {summary['rows']} rows in {summary['seconds']:.1f}s "
+               f"({summary['rows_per_second']:.0f} rows/s){' [dry run]' if dry_run else ''}")
+
 
 if __name__ == '__main__':
-    cli()
\ No newline at end of file
+    cli()
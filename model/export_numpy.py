@@ -0,0 +1,85 @@
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+import joblib
+import tensorflow as tf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.predictions.libs.numpy_model import NumpyCNNLSTM
+
+# Export weights từ file .keras sang npz cho NumpyCNNLSTM (MODEL_BACKEND=numpy)
+#   python model/export_numpy.py [model.keras] [scaler.save] [output.npz]
+MODEL_PATH = sys.argv[1] if len(sys.argv) > 1 else "./model/heart_cnn_lstm_model.keras"
+SCALER_PATH = sys.argv[2] if len(sys.argv) > 2 else "./model/scaler.save"
+OUTPUT_PATH = sys.argv[3] if len(sys.argv) > 3 else "./model/heart_cnn_lstm_model.npz"
+
+model = tf.keras.models.load_model(MODEL_PATH)
+scaler = joblib.load(SCALER_PATH)
+
+# Cấu hình + weights từng layer (Dropout/InputLayer không ảnh hưởng inference)
+layers = []
+arrays = {}
+for layer in model.layers:
+    kind = type(layer).__name__
+    config = layer.get_config()
+    if kind in ("Dropout", "InputLayer"):
+        continue
+
+    spec = {"type": kind, "name": layer.name}
+    index = len(layers)
+    if kind == "Conv1D":
+        spec.update(padding=config["padding"], strides=config["strides"][0],
+                    dilation_rate=config["dilation_rate"][0], activation=config["activation"], use_bias=config["use_bias"])
+        arrays[f"{index}/kernel"] = layer.kernel.numpy()
+    elif kind == "BatchNormalization":
+        spec.update(epsilon=config["epsilon"], center=config["center"], scale=config["scale"])
+        arrays[f"{index}/moving_mean"] = layer.moving_mean.numpy()
+        arrays[f"{index}/moving_variance"] = layer.moving_variance.numpy()
+        if config["scale"]:
+            arrays[f"{index}/gamma"] = layer.gamma.numpy()
+        if config["center"]:
+            arrays[f"{index}/beta"] = layer.beta.numpy()
+    elif kind == "MaxPooling1D":
+        spec.update(pool_size=config["pool_size"][0], strides=config["strides"][0])
+        if config["padding"] != "valid":
+            raise ValueError(f"Unsupported MaxPooling1D padding '{config['padding']}'")
+    elif kind == "LSTM":
+        spec.update(activation=config["activation"], recurrent_activation=config["recurrent_activation"],
+                    use_bias=config["use_bias"], return_sequences=config["return_sequences"])
+        if config.get("go_backwards") or config.get("stateful"):
+            raise ValueError("go_backwards/stateful LSTM is not supported")
+        arrays[f"{index}/kernel"] = layer.cell.kernel.numpy()
+        arrays[f"{index}/recurrent_kernel"] = layer.cell.recurrent_kernel.numpy()
+    elif kind == "Dense":
+        spec.update(activation=config["activation"], use_bias=config["use_bias"])
+        arrays[f"{index}/kernel"] = layer.kernel.numpy()
+    else:
+        raise ValueError(f"Unsupported layer type '{kind}'")
+
+    if spec.get("use_bias"):
+        arrays[f"{index}/bias"] = (layer.cell.bias if kind == "LSTM" else layer.bias).numpy()
+    layers.append(spec)
+
+np.savez(
+    OUTPUT_PATH,
+    layers=np.array(json.dumps(layers)),
+    scaler_mean=scaler.mean_,
+    scaler_scale=scaler.scale_,
+    **arrays
+)
+
+# Kiểm tra khớp với Keras trên toàn bộ dataset (feature chưa chuẩn hóa)
+X = pd.read_csv("./model/heart_statlog_cleveland_hungary_final.csv").drop(columns=["target"]).values
+
+engine = NumpyCNNLSTM.load(OUTPUT_PATH)
+X_scaled = scaler.transform(X)
+keras_prob = model(X_scaled.reshape(-1, X.shape[1], 1), training=False).numpy()[:, 0]
+numpy_prob = engine.predict(X)
+max_diff = np.max(np.abs(keras_prob - numpy_prob))
+
+print(f"Export: {OUTPUT_PATH} ({os.path.getsize(OUTPUT_PATH)/1024:.1f} KB, {len(layers)} layers)")
+print(f"Max |keras - numpy| trên {len(X)} mẫu: {max_diff:.2e}")
+if max_diff > 1e-5:
+    sys.exit("Numpy engine không khớp Keras (> 1e-5)")
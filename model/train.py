@@ -15,6 +15,10 @@ from tensorflow.keras.layers import (
 )
 from tensorflow.keras.regularizers import l2
 import joblib
+import json
+import os
+import subprocess
+import sys
 import time
 from timeit import default_timer as timer
 
@@ -127,4 +131,110 @@ print("\nConfusion Matrix:")
 print(confusion_matrix(y_test, y_pred_classes))
 
 # Lưu model
-model.save("./model/heart_cnn_lstm_model.keras")
\ No newline at end of file
+model.save("./model/heart_cnn_lstm_model.keras")
+
+# ===== Export TFLite (float16 + int8), scaler gộp vào model =====
+# Model serving nhận trực tiếp 7 feature chưa chuẩn hóa: (x - mean) / scale -> reshape -> CNN-LSTM
+
+# RSS đo trong process con mới cho mọi backend: sau khi import tensorflow,
+# load model + predict 1 lần; process hiện tại đã giữ model Keras nên đo tại chỗ không so sánh được
+RSS_SCRIPT = """
+import json, os, sys
+import numpy as np
+import tensorflow as tf
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+backend, path = sys.argv[1], sys.argv[2]
+x = np.array(json.load(sys.stdin), dtype=np.float32)
+before = rss_mb()
+if backend == "keras":
+    model = tf.keras.models.load_model(path)
+    model(x.reshape(-1, x.shape[1], 1), training=False)
+else:
+    interpreter = tf.lite.Interpreter(model_path=path)
+    input_index = interpreter.get_input_details()[0]["index"]
+    interpreter.resize_tensor_input(input_index, x.shape)
+    interpreter.allocate_tensors()
+    interpreter.set_tensor(input_index, x)
+    interpreter.invoke()
+print(rss_mb() - before)
+"""
+
+def rss_delta_mb(backend, path, x):
+    # RSS tăng thêm (MB) khi load model và predict x trong process con
+    result = subprocess.run([sys.executable, "-c", RSS_SCRIPT, backend, path], input=json.dumps(x.tolist()),
+                            capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+def latency_ms(fn, x, repeat=200):
+    fn(x)
+    start = timer()
+    for _ in range(repeat):
+        fn(x)
+    return (timer() - start) / repeat * 1000
+
+# Cùng test_size/random_state/stratify nên cùng chỉ số với split ở trên
+X_train_raw, X_test_raw = train_test_split(X, test_size=0.2, random_state=42, stratify=y)
+
+serving_input = Input(shape=(X.shape[1],))
+normalized = tf.keras.layers.Normalization(mean=scaler.mean_, variance=scaler.var_)(serving_input)
+normalized = tf.keras.layers.Reshape((X.shape[1], 1))(normalized)
+serving_model = tf.keras.Model(serving_input, model(normalized, training=False))
+
+def representative_dataset():
+    for row in X_train_raw[:300]:
+        yield [row.reshape(1, -1).astype(np.float32)]
+
+def export_tflite(path, quantization):
+    converter = tf.lite.TFLiteConverter.from_keras_model(serving_model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    else:
+        # int8 weights + activations; input/output vẫn float32, op nào không có bản int8 thì giữ float
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8, tf.lite.OpsSet.TFLITE_BUILTINS]
+    with open(path, "wb") as f:
+        f.write(converter.convert())
+
+def tflite_predictor(path):
+    interpreter = tf.lite.Interpreter(model_path=path)
+    input_index = interpreter.get_input_details()[0]["index"]
+    output_index = interpreter.get_output_details()[0]["index"]
+
+    def predict(x):
+        x = x.astype(np.float32)
+        interpreter.resize_tensor_input(input_index, x.shape)
+        interpreter.allocate_tensors()
+        interpreter.set_tensor(input_index, x)
+        interpreter.invoke()
+        return interpreter.get_tensor(output_index)
+
+    return predict
+
+keras_predict = lambda x: model(x.reshape(-1, X.shape[1], 1), training=False).numpy()
+keras_prob = keras_predict(scaler.transform(X_test_raw))
+keras_accuracy = accuracy_score(y_test, (keras_prob > 0.5).astype("int32"))
+
+print("\n=== TFLite export ===")
+print(f"{'backend':<10} {'size KB':>8} {'accuracy':>9} {'delta':>8} {'max |dp|':>9} {'latency ms':>11} {'RSS +MB':>8}")
+single = X_test_raw[:1]
+print(f"{'keras':<10} {os.path.getsize('./model/heart_cnn_lstm_model.keras')/1024:>8.1f} {keras_accuracy:>9.4f} "
+      f"{0:>8.4f} {0:>9.5f} {latency_ms(lambda x: keras_predict(scaler.transform(x)), single):>11.3f} "
+      f"{rss_delta_mb('keras', './model/heart_cnn_lstm_model.keras', scaler.transform(X_test_raw)):>8.1f}")
+
+for quantization, suffix in [("float16", "fp16"), ("int8", "int8")]:
+    path = f"./model/heart_cnn_lstm_model_{suffix}.tflite"
+    export_tflite(path, quantization)
+
+    predict = tflite_predictor(path)
+    tflite_prob = predict(X_test_raw)
+    rss_delta = rss_delta_mb("tflite", path, X_test_raw)
+
+    tflite_accuracy = accuracy_score(y_test, (tflite_prob > 0.5).astype("int32"))
+    print(f"{suffix:<10} {os.path.getsize(path)/1024:>8.1f} {tflite_accuracy:>9.4f} "
+          f"{tflite_accuracy - keras_accuracy:>+8.4f} {np.max(np.abs(tflite_prob - keras_prob)):>9.5f} "
+          f"{latency_ms(predict, single):>11.3f} {rss_delta:>8.1f}")